@@ -0,0 +1 @@
+"""Offline benchmarks and load tests for the Mercari agent (run with `python -m benchmarks.<name>`)."""
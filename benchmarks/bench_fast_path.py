@@ -0,0 +1,69 @@
+"""Measure the rule-based fast path against examples/sample-queries.txt.
+
+For every sample query, reports whether the parser is confident enough to
+skip the analyst LLM, what it extracted, and how long parsing took. The
+latency saved is estimated as hits x the analyst call latency, which is
+passed in (measure your own p50; the default is only a placeholder).
+
+Usage:
+    python -m benchmarks.bench_fast_path --analyst-ms 1500
+"""
+
+import argparse
+import os
+import time
+from typing import List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent.config import FAST_PATH_MIN_CONFIDENCE  # noqa: E402
+from mercari_agent.intent import parse_intent  # noqa: E402
+
+_QUERIES_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "sample-queries.txt")
+
+
+def _load_queries(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    # The first line is a "sample queries:" header.
+    return [line for line in lines if line and not line.endswith(":")]
+
+
+def main(path: str, analyst_ms: float, repeat: int) -> None:
+    queries = _load_queries(path)
+    hits = 0
+    parse_s = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            intent = parse_intent(query)
+        parse_s += (time.perf_counter() - start) / repeat
+
+        hit = intent.confidence >= FAST_PATH_MIN_CONFIDENCE
+        hits += hit
+        detail = (
+            f"keywords={intent.keywords!r} max={intent.max_price} min={intent.min_price} "
+            f"shipping={intent.shipping_preference}"
+            if hit
+            else "; ".join(intent.reasons)
+        )
+        print(f"{'HIT ' if hit else 'LLM '} {intent.confidence:.1f}  {query[:60]:<60}  {detail}")
+
+    n = len(queries)
+    print()
+    print(f"queries:            {n}")
+    print(f"fast-path hit rate: {hits}/{n} ({hits / n:.0%})")
+    print(f"mean parse time:    {parse_s / n * 1e6:.0f} us")
+    print(
+        f"latency saved:      ~{hits * analyst_ms / n:.0f} ms per turn on average"
+        f" ({analyst_ms:.0f} ms per skipped analyst call)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", default=_QUERIES_PATH)
+    parser.add_argument("--analyst-ms", type=float, default=1500.0)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.queries, args.analyst_ms, args.repeat)
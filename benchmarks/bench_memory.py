@@ -0,0 +1,109 @@
+"""Measure memory per 10k pooled products for each representation.
+
+Compares ProductFull as it was (a regular dataclass with a __dict__), the
+slotted ProductFull, and a ProductBatch. Items are built the way parsed
+API responses arrive, with a separate string/int/float object per field
+per item, and then only the representation is kept, so each figure covers
+everything it retains: containers, boxed numbers and strings (the batch
+interns item type, condition and category and unboxes numbers into arrays).
+Measured with tracemalloc, with and without item descriptions.
+
+Usage:
+    python -m benchmarks.bench_memory --items 10000 --desc-chars 0 200
+"""
+
+import argparse
+import dataclasses
+import gc
+import os
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent.batch import ProductBatch  # noqa: E402
+from mercari_agent.models import ProductFull  # noqa: E402
+
+# ProductFull before it was slotted, kept here for comparison.
+_DictProductFull = dataclasses.make_dataclass(
+    "ProductFull",
+    [
+        (f.name, f.type) if f.default is dataclasses.MISSING else (f.name, f.type, f.default)
+        for f in dataclasses.fields(ProductFull)
+    ],
+)
+
+_CATEGORIES = ["テレビ", "ゲーム機本体", "コントローラー", "ヘッドフォン", "デスクトップ型PC"]
+_CONDITIONS = ["新品、未使用", "未使用に近い", "目立った傷や汚れなし", "やや傷や汚れあり"]
+
+
+def _fresh(text: str) -> str:
+    """A new string object equal to `text`, as a JSON parser would return."""
+    return text.encode().decode()
+
+
+def _rows(n: int, desc_chars: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        dict(
+            id=f"m{rng.randrange(10**11):011d}",
+            name=f"ソニー ブラビア {rng.randint(24, 65)}型 スマートテレビ {i}",
+            price_jpy=rng.randint(300, 60000),
+            item_type=_fresh("ITEM_TYPE_MERCARI"),
+            seller_rating=round(rng.uniform(3.0, 5.0), 2),
+            seller_sales_count=rng.randint(300, 5000),
+            condition_label=_fresh(rng.choice(_CONDITIONS)),
+            created_at=f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00+09:00",
+            description=("説明" * desc_chars)[:desc_chars] + str(i) if desc_chars else None,
+            category=_fresh(rng.choice(_CATEGORIES)),
+            shipping_fee_included=rng.random() < 0.5,
+            shipping_days_min=rng.randint(1, 2),
+            shipping_days_max=rng.randint(2, 7),
+        )
+        for i in range(n)
+    ]
+
+
+def _retained_bytes(build: Callable[[List[Dict[str, Any]]], Any], n: int, desc_chars: int) -> Tuple[int, float]:
+    """Bytes still allocated once only `build`'s result is kept, and build time."""
+    gc.collect()
+    tracemalloc.start()
+    rows = _rows(n, desc_chars)
+    start = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - start
+    del rows
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, elapsed
+
+
+VARIANTS: List[Tuple[str, Callable[[List[Dict[str, Any]]], Any]]] = [
+    ("dataclass (__dict__)", lambda rows: [_DictProductFull(**row) for row in rows]),
+    ("dataclass (slots)", lambda rows: [ProductFull(**row) for row in rows]),
+    ("ProductBatch", lambda rows: ProductBatch(ProductFull(**row) for row in rows)),
+]
+
+
+def main(items: int, desc_lengths: List[int]) -> None:
+    print(f"{items} items")
+    print(f"{'representation':<22}{'desc chars':>11}{'MiB':>9}{'bytes/item':>12}{'build ms':>10}")
+    for desc_chars in desc_lengths:
+        for label, build in VARIANTS:
+            retained, elapsed = _retained_bytes(build, items, desc_chars)
+            print(
+                f"{label:<22}{desc_chars:>11}{retained / 2**20:>9.2f}"
+                f"{retained / items:>12.0f}{elapsed * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--desc-chars", type=int, nargs="+", default=[0, 200])
+    args = parser.parse_args()
+    main(args.items, args.desc_chars)
@@ -0,0 +1,169 @@
+"""End-to-end RecommendationService.recommend benchmark on FakeMercariClient.
+
+Runs recommend() for a fixed set of EN/JA queries at each combination of
+pool size (max_shallow, items fetched per search candidate) and
+concurrency, and reports per-call latency percentiles and throughput
+(calls and scored items per second). Everything is offline and seeded, so
+runs are comparable: save results with --json and pass an earlier file as
+--baseline to print the change per configuration.
+
+Usage:
+    python -m benchmarks.bench_recommend --pool-sizes 120 360 --concurrency 1 8 32
+    python -m benchmarks.bench_recommend --enrich-latency-ms 50 --json after.json --baseline before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent.fake import FakeMercariClient  # noqa: E402
+from mercari_agent.models import SearchRequest  # noqa: E402
+from mercari_agent.recommender import RecommendationService  # noqa: E402
+
+# (user query, search candidates, max price)
+_QUERIES: List[tuple] = [
+    ("I want a Sony TV under 30,000 yen", ["Sony TV", "ソニー テレビ", "スマートテレビ"], 30000),
+    ("PS5 本体 5万円以下", ["PS5 本体", "プレイステーション5", "PS5"], 50000),
+    ("Nintendo Switch with games", ["Nintendo Switch", "ニンテンドースイッチ", "スイッチ ソフト"], None),
+    ("cheap desk for my room", ["desk", "デスク"], 10000),
+    ("AirPods 美品", ["AirPods 美品", "エアーポッズ"], 15000),
+    ("Canon camera under 40k yen", ["Canon camera", "キヤノン カメラ"], 40000),
+]
+
+
+def _percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+async def _one_call(client: FakeMercariClient, query: tuple, pool_size: int, engine: str) -> tuple:
+    user_query, keywords, max_price = query
+    svc = RecommendationService(
+        client=client,
+        max_shallow=pool_size,
+        max_price_jpy=max_price,
+        scoring_engine=engine,
+    )
+    requests = [SearchRequest(query_text=k, max_price=max_price) for k in keywords]
+    start = time.perf_counter()
+    products = await svc.recommend(search_requests=requests, user_query=user_query)
+    elapsed = time.perf_counter() - start
+    # Items that passed the filters and were scored (one cached score each).
+    scored = len(svc._parts)
+    return elapsed, scored, len(products)
+
+
+async def _run_level(
+    client: FakeMercariClient, pool_size: int, concurrency: int, calls: int, engine: str
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    scored_total = 0
+    errors = 0
+
+    async def worker(i: int) -> None:
+        nonlocal scored_total, errors
+        async with semaphore:
+            try:
+                elapsed, scored, _ = await _one_call(client, _QUERIES[i % len(_QUERIES)], pool_size, engine)
+            except RuntimeError:
+                errors += 1  # injected search failure
+                return
+            latencies.append(elapsed)
+            scored_total += scored
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(calls)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "pool_size": pool_size,
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "calls_per_s": calls / wall,
+        "items_per_s": scored_total / wall,
+    }
+
+
+def _key(row: Dict[str, Any]) -> tuple:
+    return row["pool_size"], row["concurrency"]
+
+
+def _print_row(row: Dict[str, Any], baseline: Optional[Dict[tuple, Dict[str, Any]]]) -> None:
+    line = (
+        f"{row['pool_size']:>6} {row['concurrency']:>5} "
+        f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+        f"{row['calls_per_s']:>9.1f} {row['items_per_s']:>11.0f} {row['errors']:>6}"
+    )
+    before = (baseline or {}).get(_key(row))
+    if before:
+        p50 = (row["p50_ms"] / before["p50_ms"] - 1) * 100 if before["p50_ms"] else 0.0
+        ips = (row["items_per_s"] / before["items_per_s"] - 1) * 100 if before["items_per_s"] else 0.0
+        line += f"   p50 {p50:+.1f}%  items/s {ips:+.1f}%"
+    print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = FakeMercariClient(
+        catalog_size=args.catalog_size,
+        seed=args.seed,
+        search_latency_s=args.search_latency_ms / 1000,
+        enrich_latency_s=args.enrich_latency_ms / 1000,
+        search_error_rate=args.search_error_rate,
+        enrich_error_rate=args.enrich_error_rate,
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {_key(row): row for row in json.load(f)["results"]}
+
+    print(f"engine={args.engine} catalog={args.catalog_size} calls/level={args.calls}")
+    print(f"{'pool':>6} {'conc':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'items/s':>11} {'errors':>6}")
+    results: List[Dict[str, Any]] = []
+    for pool_size in args.pool_sizes:
+        # Warm-up so one-off costs (query match caches, imports) aren't measured.
+        await _run_level(client, pool_size, 1, len(_QUERIES), args.engine)
+        for concurrency in args.concurrency:
+            row = await _run_level(client, pool_size, concurrency, args.calls, args.engine)
+            results.append(row)
+            _print_row(row, baseline)
+
+    if args.json:
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[120, 360])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--calls", type=int, default=120, help="recommend() calls per level")
+    parser.add_argument("--catalog-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python")
+    parser.add_argument("--search-latency-ms", type=float, default=0.0)
+    parser.add_argument("--enrich-latency-ms", type=float, default=0.0)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--enrich-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,127 @@
+"""Compare name-relevance modes: query-token hits, character n-gram Dice and BM25.
+
+Quality: pools of FakeMercariClient catalog items are ranked by relevance
+alone for one query per product, and precision@10 counts how many of the
+top 10 are listings of that product. Queries are written the way Japanese
+users type them, without spaces ("ソニーテレビ", "PS5コントローラー"), and
+names are tested as generated and with spaces removed, as in many real
+listing titles.
+
+Speed: time to score one pool (index/matcher build plus scoring) for
+each mode, with cold and warm per-name memos.
+
+Usage:
+    python -m benchmarks.bench_relevance --pool-sizes 120 360 1200
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Callable, List, Sequence, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent import bm25, ngram, tokenizer  # noqa: E402
+from mercari_agent.bm25 import Bm25Index  # noqa: E402
+from mercari_agent.fake import _PRODUCTS, generate_catalog  # noqa: E402
+from mercari_agent.matcher import TokenMatcher  # noqa: E402
+from mercari_agent.ngram import NgramIndex  # noqa: E402
+
+ScoreFn = Callable[[Sequence[str], str], List[float]]
+
+
+def token_scores(names: Sequence[str], query: str) -> List[float]:
+    """RecommendationService's "tokens" relevance."""
+    tokens = list(tokenizer.tokenize(query))
+    matcher = TokenMatcher(tokens)
+    return [matcher.count_hits(tokenizer.normalize(name)) / max(len(tokens), 1) for name in names]
+
+
+def ngram_scores(names: Sequence[str], query: str) -> List[float]:
+    """RecommendationService's "ngram" relevance."""
+    return NgramIndex(names).dice_scores(query)
+
+
+def bm25_scores(names: Sequence[str], query: str) -> List[float]:
+    """RecommendationService's "bm25" name relevance (fresh IDF table per pool)."""
+    return Bm25Index([str(i) for i in range(len(names))], names).scores(query)
+
+
+MODES: List[Tuple[str, ScoreFn]] = [
+    ("tokens", token_scores),
+    ("ngram", ngram_scores),
+    ("bm25", bm25_scores),
+]
+
+
+def _product_of(name: str) -> int:
+    """Index into _PRODUCTS of the longest product name the listing contains."""
+    best, best_len = -1, 0
+    lowered = name.lower()
+    for idx, (en, ja, _, _) in enumerate(_PRODUCTS):
+        for label in (en.lower(), ja):
+            if label in lowered and len(label) > best_len:
+                best, best_len = idx, len(label)
+    return best
+
+
+def _precision_at_10(names: List[str], labels: List[int], score: ScoreFn) -> float:
+    total = 0.0
+    for target, (en, ja, _, _) in enumerate(_PRODUCTS):
+        query = ja.replace(" ", "")
+        scores = score(names, query)
+        top = sorted(range(len(names)), key=lambda i: (-scores[i], i))[:10]
+        total += sum(labels[i] == target for i in top) / 10
+    return total / len(_PRODUCTS)
+
+
+def _clear_memos() -> None:
+    tokenizer.tokenize.cache_clear()
+    tokenizer.normalize.cache_clear()
+    ngram.char_ngrams.cache_clear()
+    bm25.bm25_terms.cache_clear()
+
+
+def _time_ms(names: List[str], score: ScoreFn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score(names, "ソニー テレビ 24型 スマートテレビ")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(pool_sizes: List[int], seed: int) -> None:
+    catalog = generate_catalog(max(pool_sizes) * 4, seed=seed)
+    rng = random.Random(seed)
+
+    print("Precision@10, ranking a pool by name relevance alone")
+    print(f"{'pool':>6} {'names':<12}" + "".join(f"{mode:>9}" for mode, _ in MODES))
+    for size in pool_sizes:
+        pool = rng.sample(catalog, size)
+        for label, transform in (("as listed", str), ("no spaces", lambda n: n.replace(" ", ""))):
+            names = [transform(item.name) for item in pool]
+            labels = [_product_of(item.name) for item in pool]
+            row = "".join(f"{_precision_at_10(names, labels, fn):>9.2f}" for _, fn in MODES)
+            print(f"{size:>6} {label:<12}{row}")
+
+    print("\nScoring time per pool (ms)")
+    print(f"{'pool':>6}" + "".join(f"{mode + ' cold':>12}{mode + ' warm':>12}" for mode, _ in MODES))
+    for size in pool_sizes:
+        names = [item.name for item in rng.sample(catalog, size)]
+        row = ""
+        for _, fn in MODES:
+            _clear_memos()
+            cold = _time_ms(names, fn, repeat=1)
+            warm = _time_ms(names, fn)
+            row += f"{cold:>12.2f}{warm:>12.2f}"
+        print(f"{size:>6}{row}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[120, 360, 1200])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.pool_sizes, args.seed)
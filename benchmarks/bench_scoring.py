@@ -0,0 +1,94 @@
+"""Benchmark the per-item Python scoring against the vectorized numpy engine.
+
+Builds synthetic ProductShallow/ProductFull pools of 1k, 10k and 100k items,
+checks that both engines produce identical scores and top-K, and reports the
+time to score and select the top 60 of each pool: the old full sort with the
+scoring key, the heap-based selection over cached scores, and the numpy
+engine with argpartition.
+
+Usage:
+    python -m benchmarks.bench_scoring --sizes 1000 10000 100000
+"""
+
+import argparse
+import heapq
+import os
+import random
+import time
+from typing import List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent.models import ProductFull  # noqa: E402
+from mercari_agent.recommender import AbstractMercariClient, RecommendationService, SHIPPING_BONUS  # noqa: E402
+from mercari_agent.scoring import VectorScorer  # noqa: E402
+from mercari_agent.utils import tokenize  # noqa: E402
+
+_WORDS = [
+    "sony", "smart", "tv", "bravia", "4k", "used", "ps5", "本体", "コントローラー",
+    "ソニー", "スマートテレビ", "ブラビア", "テレビ", "24型", "nintendo", "switch", "美品",
+]
+_QUERY = "I want to buy a smart Sony TV under 30,000 yen スマートテレビ ソニー ブラビア"
+
+
+def _make_items(n: int, seed: int = 0) -> List[ProductFull]:
+    rng = random.Random(seed)
+    return [
+        ProductFull(
+            id=f"m{i:011d}",
+            name=" ".join(rng.sample(_WORDS, rng.randint(2, 6))),
+            price_jpy=rng.randint(300, 60000),
+            seller_rating=rng.choice([None, 3.0, 4.0, 5.0]),
+            shipping_fee_included=rng.random() < 0.5,
+        )
+        for i in range(n)
+    ]
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes: List[int], repeat: int, k: int = 60) -> None:
+    svc = RecommendationService(client=AbstractMercariClient(), max_price_jpy=30000)
+    tokens = tokenize(_QUERY)
+    scorer = VectorScorer(tokens, svc.max_price_jpy, SHIPPING_BONUS)
+
+    def full_sort(items: List[ProductFull]) -> List[ProductFull]:
+        svc._set_tokens(tokens)  # fresh per-call score cache
+        return sorted(items, key=svc._deep_score, reverse=True)[:k]
+
+    def heap_top_k(items: List[ProductFull]) -> List[ProductFull]:
+        svc._set_tokens(tokens)
+        return heapq.nlargest(k, items, key=svc._deep_score)
+
+    def numpy_top_k(items: List[ProductFull]) -> List[ProductFull]:
+        return [items[i] for i in scorer.rank(scorer.deep_scores(items), k)]
+
+    print(f"{'items':>8} {'sort ms':>9} {'heap ms':>9} {'numpy ms':>9} {'numpy vs sort':>14}")
+    for n in sizes:
+        items = _make_items(n)
+        svc._set_tokens(tokens)
+        assert scorer.deep_scores(items).tolist() == [svc._deep_score(p) for p in items]
+        assert full_sort(items) == heap_top_k(items) == numpy_top_k(items)
+
+        sort_s = _timed(lambda: full_sort(items), repeat)
+        heap_s = _timed(lambda: heap_top_k(items), repeat)
+        numpy_s = _timed(lambda: numpy_top_k(items), repeat)
+        print(
+            f"{n:>8} {sort_s * 1000:>9.2f} {heap_s * 1000:>9.2f} {numpy_s * 1000:>9.2f}"
+            f" {sort_s / numpy_s:>13.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
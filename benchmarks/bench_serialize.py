@@ -0,0 +1,96 @@
+"""Benchmark product serialization: asdict + json.dumps vs the fast path.
+
+Builds ranked ProductFull payloads of 10 and 100 items from the
+FakeMercariClient catalog (descriptions padded to --desc-chars, like full
+Mercari descriptions) and times, per payload, turning the products into
+the UTF-8 bytes sent to clients:
+
+- old: dataclasses.asdict per product, then json.dumps(ensure_ascii=False)
+- fields + json: serialize_product (direct field reads), stdlib encoder
+- fields + orjson: serialize_product, orjson (if installed)
+
+Usage:
+    python -m benchmarks.bench_serialize --items 10 100 --desc-chars 1000
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent import utils  # noqa: E402
+from mercari_agent.fake import generate_catalog  # noqa: E402
+from mercari_agent.models import ProductFull  # noqa: E402
+from mercari_agent.recommender import AbstractMercariClient, RecommendationService  # noqa: E402
+from mercari_agent.utils import product_url, serialize_product  # noqa: E402
+
+
+def _old_serialize(p: ProductFull) -> Dict[str, Any]:
+    """serialize_product before the fast path (kept here for comparison)."""
+    data = dataclasses.asdict(p)
+    data["url"] = product_url(p)
+    return data
+
+
+def _products(n: int, desc_chars: int, seed: int = 0) -> List[ProductFull]:
+    svc = RecommendationService(client=AbstractMercariClient())
+    products = []
+    for item in generate_catalog(n, seed=seed):
+        p = svc._merge_full(svc._full_fields(item.detail), svc._parse_shallow(item))
+        text = p.description or "説明"
+        p.description = (text * (desc_chars // len(text) + 1))[:desc_chars]
+        products.append(p)
+    return products
+
+
+def _stdlib_dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _paths() -> List[Tuple[str, Callable[[List[ProductFull]], bytes]]]:
+    paths: List[Tuple[str, Callable[[List[ProductFull]], bytes]]] = [
+        ("old (asdict + json)", lambda ps: json.dumps([_old_serialize(p) for p in ps], ensure_ascii=False).encode()),
+        ("fields + json", lambda ps: _stdlib_dumps([serialize_product(p) for p in ps])),
+    ]
+    if utils.orjson is not None:
+        paths.append(("fields + orjson", lambda ps: utils.orjson.dumps([serialize_product(p) for p in ps])))
+    return paths
+
+
+def _best_us(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def main(sizes: List[int], desc_chars: int, repeat: int) -> None:
+    paths = _paths()
+    if utils.orjson is None:
+        print("orjson is not installed; only the stdlib paths are timed")
+    print(f"{'items':>6} {'path':<22}{'us/payload':>12}{'KiB':>8}{'speedup':>9}")
+    for n in sizes:
+        products = _products(n, desc_chars)
+        decoded = [json.loads(fn(products)) for _, fn in paths]
+        assert all(d == decoded[0] for d in decoded), "paths disagree"
+        baseline = None
+        for label, fn in paths:
+            us = _best_us(lambda: fn(products), repeat)
+            baseline = baseline or us
+            size_kib = len(fn(products)) / 1024
+            print(f"{n:>6} {label:<22}{us:>12.1f}{size_kib:>8.1f}{baseline / us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--desc-chars", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.items, args.desc_chars, args.repeat)
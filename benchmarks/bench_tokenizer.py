@@ -0,0 +1,112 @@
+"""Benchmark the tokenizer: JA recall and CPU against the previous regex tokenizer.
+
+Recall: item names from the FakeMercariClient catalog are rewritten into
+common listing variants (full-width ASCII, half-width katakana, hiragana)
+and each is checked for whether every token of its product's query still
+matches as a substring, as RecommendationService's relevance does.
+
+CPU: tokenizes the catalog names with the old uncompiled, un-normalized
+tokenizer, the new tokenize() cold and warm (memoized), and tokenize_many().
+"Cold" starts from empty memos but still hits them for names repeated in
+the catalog, as listing titles repeat in real search pools.
+
+Usage:
+    python -m benchmarks.bench_tokenizer --names 5000
+"""
+
+import argparse
+import os
+import re
+import time
+import unicodedata
+from typing import Callable, List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from mercari_agent import tokenizer  # noqa: E402
+from mercari_agent.fake import _PRODUCTS, generate_catalog  # noqa: E402
+
+
+def _old_tokenize(text: str) -> List[str]:
+    """utils.tokenize before the tokenizer module (kept here for comparison)."""
+    tokens = re.findall(r"[A-Za-z0-9ぁ-んァ-ン一-龥ー]+", text.lower())
+    seen = set()
+    uniq: List[str] = []
+    for t in tokens:
+        if t not in seen:
+            seen.add(t)
+            uniq.append(t)
+    return uniq
+
+
+def _full_width(text: str) -> str:
+    return "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in text)
+
+
+def _half_width_kana(text: str) -> str:
+    # NFKC's inverse isn't in the stdlib; map through the half-width block by name.
+    out = []
+    for c in text:
+        try:
+            out.append(unicodedata.lookup("HALFWIDTH " + unicodedata.name(c)))
+        except (KeyError, ValueError):
+            out.append(c)
+    return "".join(out)
+
+
+def _hiragana(text: str) -> str:
+    return "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in text)
+
+
+_VARIANTS = {"original": str, "full-width": _full_width, "half-width kana": _half_width_kana, "hiragana": _hiragana}
+
+
+def _recall(names: List[str], queries: List[str], tok: Callable[[str], List[str]], norm: Callable[[str], str]) -> float:
+    hits = 0
+    for name, query in zip(names, queries):
+        tokens = tok(query)
+        text = norm(name)
+        hits += bool(tokens) and all(t in text for t in tokens)
+    return hits / len(names)
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(n_names: int) -> None:
+    catalog = generate_catalog(n_names, seed=0)
+    ja_by_en = {en: ja for en, ja, _, _ in _PRODUCTS}
+    # Items whose name carries the Japanese product name; the query is that name.
+    pairs = [(item.name, ja) for item in catalog for en, ja in ja_by_en.items() if ja in item.name]
+    names = [name for name, _ in pairs]
+    queries = [ja for _, ja in pairs]
+
+    print(f"Recall of JA query tokens in {len(names)} JA item names (query and name written differently)")
+    print(f"{'variant':<16} {'old':>7} {'new':>7}")
+    for label, variant in _VARIANTS.items():
+        varied = [variant(name) for name in names]
+        old = _recall(varied, queries, _old_tokenize, str.lower)
+        new = _recall(varied, queries, lambda q: list(tokenizer.tokenize(q)), tokenizer.normalize)
+        print(f"{label:<16} {old:>7.1%} {new:>7.1%}")
+
+    all_names = [item.name for item in catalog]
+    tokenizer.tokenize.cache_clear()
+    tokenizer.normalize.cache_clear()
+    rows = [
+        ("old tokenize", _timed(lambda: [_old_tokenize(n) for n in all_names])),
+        ("tokenize (cold)", _timed(lambda: [tokenizer.tokenize(n) for n in all_names])),
+        ("tokenize (warm)", _timed(lambda: [tokenizer.tokenize(n) for n in all_names])),
+        ("tokenize_many (warm)", _timed(lambda: tokenizer.tokenize_many(all_names))),
+    ]
+    print(f"\nTokenizing {len(all_names)} item names")
+    for label, seconds in rows:
+        print(f"{label:<21} {seconds * 1000:>8.2f} ms  ({seconds / len(all_names) * 1e6:.2f} us/name)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=5000)
+    main(parser.parse_args().names)
@@ -0,0 +1,163 @@
+"""Load test for MercariChatAgent against a local fake OpenAI endpoint.
+
+Starts a tiny HTTP server that mimics /v1/chat/completions with a fixed
+latency, then runs many chat turns at increasing concurrency. With the async
+client, throughput should scale roughly linearly with concurrency until the
+fake endpoint (or the CPU) saturates.
+
+Agents run with the fast path off and the LLM renderer, so every turn makes
+the analyst and presentation calls; the calls the endpoint actually served
+are counted and reported per turn.
+
+Usage:
+    python -m benchmarks.load_test_openai --latency-ms 200 --turns 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+from typing import Any, Iterable, List, Optional, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-load-test")
+
+from openai import AsyncOpenAI  # noqa: E402
+
+from mercari_agent import MercariChatAgent  # noqa: E402
+from mercari_agent.models import SearchRequest  # noqa: E402
+from mercari_agent.recommender import AbstractMercariClient, IncludeFn  # noqa: E402
+
+
+def _completion(message: dict) -> dict:
+    return {
+        "id": "chatcmpl-load-test",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def _fake_reply(body: dict) -> dict:
+    """Analyst requests (with tools) get a tool call, presentation requests get text."""
+    if body.get("tools"):
+        args = {"candidates": [{"keywords": "PS5", "max_price_jpy": 50000}]}
+        return _completion(
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_load_test",
+                        "type": "function",
+                        "function": {"name": "get_recommendations", "arguments": json.dumps(args)},
+                    }
+                ],
+            }
+        )
+    return _completion({"role": "assistant", "content": "1. PS5\n   - Price: 45000 JPY"})
+
+
+class _CallCounter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+
+async def _serve(latency: float, counter: _CallCounter) -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                body = json.loads(await reader.readexactly(length)) if length else {}
+                counter.calls += 1
+                await asyncio.sleep(latency)
+                payload = json.dumps(_fake_reply(body)).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+class _EmptyMercariClient(AbstractMercariClient):
+    """Keeps the load test on the LLM path: searches return nothing instantly."""
+
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        return []
+
+    async def enrich_item(self, raw_item: Any) -> Any:
+        return None
+
+
+async def _run_level(oai: AsyncOpenAI, concurrency: int, turns: int) -> Tuple[int, float]:
+    """Run `turns` chat turns spread over `concurrency` agents; return (turns run, turns/sec)."""
+    agents = [
+        MercariChatAgent(
+            mercari_client=_EmptyMercariClient(),
+            openai_client=oai,
+            fast_path=False,
+            render_mode="llm",
+        )
+        for _ in range(concurrency)
+    ]
+
+    async def worker(agent: MercariChatAgent, n: int) -> None:
+        for _ in range(n):
+            await agent.chat("PS5 under 50000 yen")
+
+    per_agent = max(1, turns // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(a, per_agent) for a in agents])
+    elapsed = time.perf_counter() - start
+    return per_agent * concurrency, per_agent * concurrency / elapsed
+
+
+async def main(levels: List[int], turns: int, latency_ms: float) -> None:
+    counter = _CallCounter()
+    server = await _serve(latency_ms / 1000.0, counter)
+    port = server.sockets[0].getsockname()[1]
+    oai = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="sk-load-test", max_retries=0)
+
+    print(f"fake endpoint latency: {latency_ms:.0f} ms per call")
+    print(f"{'concurrency':>12} {'turns/sec':>10} {'calls/turn':>11} {'speedup':>8}")
+    baseline = None
+    for level in levels:
+        counter.calls = 0
+        # The agent prints progress lines per turn; keep the report readable.
+        with contextlib.redirect_stdout(io.StringIO()):
+            n_turns, tps = await _run_level(oai, level, turns)
+        baseline = baseline or tps
+        print(f"{level:>12} {tps:>10.2f} {counter.calls / n_turns:>11.1f} {tps / baseline:>7.1f}x")
+
+    await oai.close()
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--turns", type=int, default=64, help="Total turns per concurrency level.")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.levels, args.turns, args.latency_ms))
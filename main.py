@@ -1,11 +1,35 @@
-"""Simple CLI entry point for the Mercari shopping agent."""
+"""Simple CLI entry point for the Mercari shopping agent.
 
+    python main.py                              # live chat
+    python main.py --record session.jsonl.gz    # live chat, recording all Mercari/OpenAI traffic
+    python main.py --replay session.jsonl.gz    # re-run a recorded conversation offline
+"""
+
+import argparse
 import asyncio
+import time
+
+from openai import AsyncOpenAI
 
-from mercari_agent import MercariChatAgent
+from mercari_agent import CachedMercariClient, MercapiClient, MercariChatAgent
+from mercari_agent.replay import (
+    Recorder,
+    RecordingMercariClient,
+    RecordingOpenAI,
+    ReplayMercariClient,
+    ReplayOpenAI,
+    load_events,
+)
 
-async def main() -> None:
-    agent = MercariChatAgent()
+async def main(record: str | None = None) -> None:
+    recorder = Recorder(record) if record else None
+    if recorder is not None:
+        agent = MercariChatAgent(
+            mercari_client=CachedMercariClient(RecordingMercariClient(MercapiClient(), recorder)),
+            openai_client=RecordingOpenAI(AsyncOpenAI(), recorder),
+        )
+    else:
+        agent = MercariChatAgent()
     print("Mercari assistant is ready. Type 'exit' or 'quit' to stop.")
 
     while True:
@@ -21,11 +45,38 @@ async def main() -> None:
             print("Goodbye.")
             break
 
+        if recorder is not None:
+            recorder.record("user", None, user_input)
         reply = await agent.chat(user_input)
         print(f"Agent: {reply}\n")
 
+    if recorder is not None:
+        recorder.close()
     print("Session ended.")
 
 
+async def replay(path: str, time_scale: float) -> None:
+    """Re-run the user messages of a recording against recorded responses."""
+    agent = MercariChatAgent(
+        mercari_client=CachedMercariClient(ReplayMercariClient(path, time_scale=time_scale)),
+        openai_client=ReplayOpenAI(path, time_scale=time_scale),
+    )
+    for event in load_events(path):
+        if event["k"] != "user":
+            continue
+        print(f"You: {event['r']}")
+        start = time.perf_counter()
+        reply = await agent.chat(event["r"])
+        print(f"Agent: {reply}\n({time.perf_counter() - start:.2f}s)\n")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Mercari shopping agent CLI")
+    parser.add_argument("--record", metavar="PATH", help="record Mercari/OpenAI traffic to PATH")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded conversation offline")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="replay latency multiplier (0 = no delays)")
+    args = parser.parse_args()
+    if args.replay:
+        asyncio.run(replay(args.replay, args.time_scale))
+    else:
+        asyncio.run(main(args.record))
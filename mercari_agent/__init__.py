@@ -1,3 +1,6 @@
 from .recommender import RecommendationService, MercapiClient
+from .cache import CachedMercariClient, ItemCache
 from .models import ProductShallow, ProductFull
+from .batch import ProductBatch
 from .agent import MercariChatAgent
+from .sessions import SessionManager
@@ -2,21 +2,33 @@
 
 Two-step flow:
 1. Analyst LLM decides when to search via get_recommendations tool
+   (simple queries are parsed locally instead, see intent.parse_intent)
 2. Presentation LLM formats top-3 results for user
+   (or render.render_recommendations fills the template locally, see RENDER_MODE)
 
-Entry points: MercariChatAgent.chat()
+Entry points: MercariChatAgent.chat(), MercariChatAgent.chat_stream()
 """
 
 import json
-from typing import Any, Dict, List, Optional
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from openai import OpenAI
-from .config import MODEL_NAME, MAX_TURNS
-from .models import SearchRequest
+from openai import AsyncOpenAI
+from . import metrics, tracing
+from .bm25 import IdfCache
+from .cache import CachedMercariClient, ItemCache
+from .config import FAST_PATH_ENABLED, FAST_PATH_MIN_CONFIDENCE, MODEL_NAME, RENDER_MODE
+from .history import HistoryManager
+from .intent import parse_intent
+from .models import ProductFull, SearchRequest
+from .payload import PAYLOAD_KEY_LEGEND, build_tool_payload
 from .recommender import AbstractMercariClient, MercapiClient, RecommendationService
+from .render import render_recommendations
 from .utils import serialize_product, message_to_dict
 
-_oai = OpenAI()
+# Shared async client: every agent in the process reuses one HTTP connection pool,
+# so concurrent chats don't block the event loop or open a pool each.
+_oai = AsyncOpenAI()
 
 # System prompt used for the first ("analyst") LLM call.
 SYSTEM_ANALYST_PROMPT = (
@@ -48,6 +60,7 @@ SYSTEM_PRESENTATION_PROMPT = (
     "   - Price: XXX JPY\n"
     "   - URL: XXX\n"
     "   - Reason:\n\n"
+    + PAYLOAD_KEY_LEGEND
 )
 
 
@@ -113,38 +126,102 @@ tools = [
 class MercariChatAgent:
     """Mercari Two-step LLM pattern: analyst (tool calling) → presentation (formatting)."""
 
-    def __init__(self, mercari_client: AbstractMercariClient | None = None) -> None:
-        self.history: List[Dict[str, Any]] = []
-        # Reuse a single Mercari client instance for all tool calls.
-        self._mercari_client: AbstractMercariClient = mercari_client or MercapiClient()
+    def __init__(
+        self,
+        mercari_client: AbstractMercariClient | None = None,
+        openai_client: AsyncOpenAI | None = None,
+        item_cache: ItemCache | None = None,
+        idf_cache: IdfCache | None = None,
+        fast_path: bool = FAST_PATH_ENABLED,
+        render_mode: str = RENDER_MODE,
+    ) -> None:
+        if render_mode not in ("llm", "template"):
+            raise ValueError(f"Unknown render_mode: {render_mode!r}")
+        # Recent turns verbatim, older ones summarized, within a token budget.
+        self.history = HistoryManager()
+        # Defaults to the module-level client so all agents share its connection pool.
+        self._oai: AsyncOpenAI = openai_client or _oai
+        # Reuse a single Mercari client instance for all tool calls; repeated searches
+        # within the cache TTL skip the network entirely.
+        self._mercari_client: AbstractMercariClient = mercari_client or CachedMercariClient(
+            MercapiClient()
+        )
+        # Enriched item details outlive a single turn so overlapping queries reuse them.
+        self._item_cache: ItemCache = item_cache or ItemCache()
+        # BM25 name statistics by search keywords, kept across turns (see bm25.IdfCache).
+        self._idf_cache: IdfCache = idf_cache or IdfCache()
+        # Skip the analyst LLM when the rule parser fully understands the query.
+        self.fast_path = fast_path
+        # "template" formats search results locally instead of calling the presentation LLM.
+        self.render_mode = render_mode
 
     async def chat(self, user_query: str) -> str:
         """Handle one turn of conversation and return the assistant reply."""
+        final_reply = ""
+        async for event, data in self._turn(user_query, stream=False):
+            if event == "done":
+                final_reply = data["reply"]
+        return final_reply
+
+    async def chat_stream(self, user_query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Handle one turn, yielding (event, data) pairs as each stage completes.
+
+        Events, in order:
+        - "searching": {"keywords": [...]} before the Mercari searches run
+        - "ranked": {"items": [...]} as soon as the recommender returns
+        - "token": {"text": "..."} for each piece of the reply as it arrives
+        - "done": {"reply": "..."} with the full reply, always last
+        """
+        async for event in self._turn(user_query, stream=True):
+            yield event
+
+    async def _turn(
+        self, user_query: str, stream: bool
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """One conversation turn as an event stream (see chat_stream)."""
+        with tracing.span("turn", stream=stream):
+            async for event in self._turn_events(user_query, stream):
+                yield event
+
+    async def _turn_events(
+        self, user_query: str, stream: bool
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
         user_msg: Dict[str, str] = {"role": "user", "content": user_query}
         # Build working messages with history + current user query
-        working_messages: List[Dict[str, Any]] = [*self.history, user_msg]
+        working_messages: List[Dict[str, Any]] = [*self.history.prompt_messages(), user_msg]
 
         try:
-            # First step: analyst LLM to decide on tool calls or direct reply
-            first = _oai.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[{"role": "system", "content": SYSTEM_ANALYST_PROMPT}, *working_messages],
-                tools=tools,
-                tool_choice="auto",
-            )
-            first_msg = first.choices[0].message
-            assistant_entry = message_to_dict(first_msg)
+            # First step: the rule-based fast path when it's confident, otherwise the
+            # analyst LLM, decides on tool calls or a direct reply.
+            with tracing.span("fast_path") as sp:
+                assistant_entry = self._fast_path_entry(user_query)
+                sp.set(hit=assistant_entry is not None)
+            if assistant_entry is None:
+                with tracing.span("analyst_llm", messages=len(working_messages) + 1) as sp:
+                    first = await self._oai.chat.completions.create(
+                        model=MODEL_NAME,
+                        messages=[{"role": "system", "content": SYSTEM_ANALYST_PROMPT}, *working_messages],
+                        tools=tools,
+                        tool_choice="auto",
+                    )
+                    metrics.record_llm_usage("analyst", first.usage)
+                    assistant_entry = message_to_dict(first.choices[0].message)
+                    sp.set(tool_calls=len(assistant_entry.get("tool_calls") or []))
 
             tool_msgs: List[Dict[str, Any]] = []
+            # Inputs for the templated renderer, gathered across tool calls.
+            ranked: List[ProductFull] = []
+            budget: int | None = None
+            keywords: List[str] = []
             # If tool calls were made, execute them
-            if first_msg.tool_calls:
-                for tc in first_msg.tool_calls:
+            if assistant_entry.get("tool_calls"):
+                for tc in assistant_entry["tool_calls"]:
                     # Ignore unknown tool calls
-                    if tc.function.name != "get_recommendations":
+                    if tc["function"]["name"] != "get_recommendations":
                         continue
 
                     try:
-                        args: Dict[str, Any] = json.loads(tc.function.arguments)
+                        args: Dict[str, Any] = json.loads(tc["function"]["arguments"])
                     except json.JSONDecodeError as e:
                         print(f"Warning: Failed to parse tool args: {e}, using fallback")
                         args = {"candidates": []}
@@ -152,97 +229,173 @@ class MercariChatAgent:
                     # Build search requests directly from tool args and call the recommender.
                     candidates_payload = args.get("candidates") or []
                     # print(candidates_payload)
-                    if not candidates_payload:
-                        recs: List[Dict[str, Any]] = []
+                    search_requests = self._build_search_requests(candidates_payload)
+                    if not search_requests:
+                        content = "[]"
                     else:
+                        yield "searching", {"keywords": [r.query_text for r in search_requests]}
+
                         # Compute a global max price for scoring/filtering from candidates.
-                        max_values = [
-                            c.get("max_price_jpy")
-                            for c in candidates_payload
-                            if c.get("max_price_jpy") is not None
-                        ]
+                        max_values = [r.max_price for r in search_requests if r.max_price is not None]
                         global_max_price: int | None = min(max_values) if max_values else None
 
                         # Initialize the recommendation service.
                         svc = RecommendationService(
                             client=self._mercari_client,
                             max_price_jpy=global_max_price,
+                            item_cache=self._item_cache,
+                            idf_cache=self._idf_cache,
                         )
-
-                        search_requests: List[SearchRequest] = []
-
-                        for cand in candidates_payload:
-                            # Validate required fields
-                            keywords = cand.get("keywords")
-                            if not isinstance(keywords, str) or not keywords.strip():
-                                continue
-                            # Generate SearchRequest
-                            search_requests.append(
-                                SearchRequest(
-                                    query_text=keywords.strip(),
-                                    min_price=cand.get("min_price_jpy"),
-                                    max_price=cand.get("max_price_jpy"),
-                                    shipping_preference=cand.get("shipping_preference"),
-                                    #condition=cand.get("condition"),
-                                    location=cand.get("location"),
-                                    brand=cand.get("brand"),
-                                )
-                            )
-
-                        if not search_requests:
-                            recs = []
-                        else:
+                        with tracing.span("recommend", candidates=len(search_requests)) as sp:
                             products = await svc.recommend(
                                 search_requests=search_requests,
                                 user_query=user_query,
                             )
-                            print("Reasoning...")
+                            sp.set(items=len(products))
+                        print("Reasoning...")
+                        ranked.extend(products)
+                        budget = global_max_price if budget is None else budget
+                        keywords.extend(r.query_text for r in search_requests)
+                        with tracing.span("serialize", items=len(products)) as sp:
                             recs = [serialize_product(p) for p in products]
+                            if self.render_mode == "template":
+                                # Rendered locally from `ranked`; no LLM reads the tool message.
+                                content = ""
+                            else:
+                                # Compact, token-budgeted copy for the presentation prompt.
+                                content, stats = build_tool_payload(products)
+                                sp.set(tokens_after=stats.tokens_after, items_kept=stats.items_after)
+                        yield "ranked", {"items": recs}
                     # Append tool response message
                     tool_msgs.append(
                         {
                             "role": "tool",
-                            "tool_call_id": tc.id,
+                            "tool_call_id": tc["id"],
                             "name": "get_recommendations",
-                            "content": json.dumps(recs, ensure_ascii=False),
+                            "content": content,
                         }
                     )
 
             # Presentation step: summarize and format top results.
             final_reply: Optional[str] = None
-            if tool_msgs:
+            if tool_msgs and self.render_mode == "template":
+                with tracing.span("render", items=len(ranked)):
+                    final_reply = render_recommendations(ranked, max_price_jpy=budget, keywords=keywords)
+                if stream:
+                    yield "token", {"text": final_reply}
+                self.history.append_turn(user_msg, {"role": "assistant", "content": final_reply})
+            elif tool_msgs:
                 summary_messages: List[Dict[str, Any]] = [
                     {"role": "system", "content": SYSTEM_PRESENTATION_PROMPT},
                     *working_messages,
                     assistant_entry,
                     *tool_msgs,
                 ]
-                # Call LLM to generate final reply
-                second = _oai.chat.completions.create(
-                    model=MODEL_NAME,
-                    messages=summary_messages,
-                )
-                final_msg = second.choices[0].message
-                final_reply = final_msg.content or ""
-                final_entry = message_to_dict(final_msg)
+                if stream:
+                    # Forward the reply token by token as the model produces it.
+                    # (The span runs until the last token, including time the
+                    # consumer spends on each event.)
+                    parts: List[str] = []
+                    with tracing.span("presentation_llm", stream=True) as sp:
+                        chunks = await self._oai.chat.completions.create(
+                            model=MODEL_NAME,
+                            messages=summary_messages,
+                            stream=True,
+                            stream_options={"include_usage": True},
+                        )
+                        usage = None
+                        async for chunk in chunks:
+                            # With include_usage the last chunk carries usage and no choices.
+                            usage = getattr(chunk, "usage", None) or usage
+                            if not chunk.choices:
+                                continue
+                            text = chunk.choices[0].delta.content
+                            if text:
+                                parts.append(text)
+                                yield "token", {"text": text}
+                        sp.set(chunks=len(parts))
+                    metrics.record_llm_usage("presentation", usage)
+                    final_reply = "".join(parts)
+                    final_entry: Dict[str, Any] = {"role": "assistant", "content": final_reply}
+                else:
+                    # Call LLM to generate final reply
+                    with tracing.span("presentation_llm", stream=False):
+                        second = await self._oai.chat.completions.create(
+                            model=MODEL_NAME,
+                            messages=summary_messages,
+                        )
+                    metrics.record_llm_usage("presentation", second.usage)
+                    final_msg = second.choices[0].message
+                    final_reply = final_msg.content or ""
+                    final_entry = message_to_dict(final_msg)
                 # Persist only the user request and the final natural-language reply.
-                self.history.extend([user_msg, final_entry])
+                self.history.append_turn(user_msg, final_entry)
             else:
-                final_reply = first_msg.content or ""
+                final_reply = assistant_entry.get("content") or ""
+                if stream and final_reply:
+                    yield "token", {"text": final_reply}
                 # Persist the user request and the initial assistant reply.
-                self.history.extend([user_msg, assistant_entry])
+                self.history.append_turn(user_msg, assistant_entry)
         # Catch-all for unexpected errors
         except Exception as e:
             print(f"Error in chat: {e}")
             final_reply = "Sorry, something went wrong. Please try again in a moment."
-            self.history.extend(
-                [
-                    user_msg,
-                    {"role": "assistant", "content": final_reply},
-                ]
-            )
+            self.history.append_turn(user_msg, {"role": "assistant", "content": final_reply})
 
-        # Trim history to the most recent MAX_TURNS turns.
-        self.history = self.history[-2 * MAX_TURNS :]
+        yield "done", {"reply": final_reply}
 
-        return final_reply
+    def _fast_path_entry(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Analyst step without the LLM: a synthetic get_recommendations call, or None.
+
+        Only used when the rule parser is confident; its single candidate
+        goes through the same tool path as LLM-generated ones.
+        """
+        if not self.fast_path:
+            return None
+        intent = parse_intent(user_query)
+        if intent.confidence < FAST_PATH_MIN_CONFIDENCE:
+            return None
+        candidate: Dict[str, Any] = {"keywords": intent.keywords}
+        if intent.min_price is not None:
+            candidate["min_price_jpy"] = intent.min_price
+        if intent.max_price is not None:
+            candidate["max_price_jpy"] = intent.max_price
+        if intent.shipping_preference:
+            candidate["shipping_preference"] = intent.shipping_preference
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_fastpath_{uuid.uuid4().hex[:16]}",
+                    "type": "function",
+                    "function": {
+                        "name": "get_recommendations",
+                        "arguments": json.dumps({"candidates": [candidate]}, ensure_ascii=False),
+                    },
+                }
+            ],
+        }
+
+    @staticmethod
+    def _build_search_requests(candidates_payload: List[Dict[str, Any]]) -> List[SearchRequest]:
+        """Turn get_recommendations candidates into SearchRequests, skipping invalid ones."""
+        search_requests: List[SearchRequest] = []
+        for cand in candidates_payload:
+            # Validate required fields
+            keywords = cand.get("keywords")
+            if not isinstance(keywords, str) or not keywords.strip():
+                continue
+            # Generate SearchRequest
+            search_requests.append(
+                SearchRequest(
+                    query_text=keywords.strip(),
+                    min_price=cand.get("min_price_jpy"),
+                    max_price=cand.get("max_price_jpy"),
+                    shipping_preference=cand.get("shipping_preference"),
+                    #condition=cand.get("condition"),
+                    location=cand.get("location"),
+                    brand=cand.get("brand"),
+                )
+            )
+        return search_requests
@@ -0,0 +1,126 @@
+"""Columnar product container.
+
+ProductBatch stores a pool of products column by column instead of one
+object per item: prices, seller stats, shipping flag and shipping days sit
+in `array` buffers (8 or fewer bytes per item, no boxed ints/floats), and
+the low-cardinality strings (item type, condition, category) are interned
+so every item shares one copy. Unknown values use a sentinel (NaN for
+ratings, -1 for counts/days/flags).
+
+VectorScorer reads the numeric columns straight from the buffers. The
+batch is opt-in: RecommendationService scores its per-call pools as plain
+lists, since converting them costs more than the batch saves there; it is
+meant for pools kept in memory for a long time.
+Indexing or iterating a batch yields ProductFull rows, so per-item code
+(scoring, serialize_product, rendering) works on it unchanged.
+"""
+
+import math
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+from .models import ProductFull, ProductShallow
+
+_UNKNOWN = -1  # prices, counts and days are never negative
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def _int_or_unknown(value: Optional[int]) -> int:
+    return _UNKNOWN if value is None else value
+
+
+def _int_or_none(value: int) -> Optional[int]:
+    return None if value == _UNKNOWN else value
+
+
+class ProductBatch:
+    """A pool of products stored as columns (see module docstring)."""
+
+    def __init__(self, products: Iterable[ProductShallow] = ()) -> None:
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.prices = array("q")
+        self.ratings = array("d")  # NaN = unknown
+        self.sales = array("q")
+        self.shipping = array("b")  # 1 = seller pays (fee included), 0 = buyer pays
+        self.days_min = array("h")
+        self.days_max = array("h")
+        self.item_types: List[Optional[str]] = []
+        self.conditions: List[Optional[str]] = []
+        self.categories: List[Optional[str]] = []
+        self.urls: List[Optional[str]] = []
+        self.created_at: List[Optional[str]] = []
+        self.descriptions: List[Optional[str]] = []
+        self.attributes: List[Optional[dict]] = []
+        self.extend(products)
+
+    def append(self, p: ProductShallow) -> None:
+        """Add a ProductShallow or ProductFull (detail columns stay unknown for shallow items)."""
+        self.ids.append(p.id)
+        self.names.append(p.name)
+        self.prices.append(p.price_jpy)
+        self.ratings.append(math.nan if p.seller_rating is None else p.seller_rating)
+        self.sales.append(_int_or_unknown(p.seller_sales_count))
+        self.item_types.append(_intern(p.item_type))
+        self.conditions.append(_intern(p.condition_label))
+        self.urls.append(p.url)
+        self.created_at.append(p.created_at)
+        if isinstance(p, ProductFull):
+            fee = p.shipping_fee_included
+            self.shipping.append(_UNKNOWN if fee is None else int(fee))
+            self.days_min.append(_int_or_unknown(p.shipping_days_min))
+            self.days_max.append(_int_or_unknown(p.shipping_days_max))
+            self.categories.append(_intern(p.category))
+            self.descriptions.append(p.description)
+            self.attributes.append(p.attributes)
+        else:
+            self.shipping.append(_UNKNOWN)
+            self.days_min.append(_UNKNOWN)
+            self.days_max.append(_UNKNOWN)
+            self.categories.append(None)
+            self.descriptions.append(None)
+            self.attributes.append(None)
+
+    def extend(self, products: Iterable[ProductShallow]) -> None:
+        for p in products:
+            self.append(p)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> ProductFull:
+        """Row `i` as a ProductFull (a new object; changing it doesn't change the batch)."""
+        rating = self.ratings[i]
+        shipping = self.shipping[i]
+        return ProductFull(
+            id=self.ids[i],
+            name=self.names[i],
+            price_jpy=self.prices[i],
+            item_type=self.item_types[i],
+            seller_rating=None if math.isnan(rating) else rating,
+            seller_sales_count=_int_or_none(self.sales[i]),
+            condition_label=self.conditions[i],
+            url=self.urls[i],
+            created_at=self.created_at[i],
+            description=self.descriptions[i],
+            category=self.categories[i],
+            attributes=self.attributes[i],
+            shipping_fee_included=None if shipping == _UNKNOWN else bool(shipping),
+            shipping_days_min=_int_or_none(self.days_min[i]),
+            shipping_days_max=_int_or_none(self.days_max[i]),
+        )
+
+    def __iter__(self) -> Iterator[ProductFull]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, indices: Iterable[int]) -> List[ProductFull]:
+        """Rows at `indices` (e.g. VectorScorer.rank output), in that order."""
+        return [self[i] for i in indices]
+
+    def __repr__(self) -> str:
+        return f"ProductBatch({len(self)} items)"
@@ -0,0 +1,180 @@
+"""BM25 relevance over pooled search results.
+
+Terms are ASCII/Latin words kept whole and CJK/kana runs split into
+character bigrams (Japanese titles rarely have spaces, so bigrams stand in
+for word segmentation). Bm25Index builds a term -> (item, tf) inverted
+index over one pool of texts and scores a query with Okapi BM25; scores
+are divided by the pool's best so they fall in [0, 1] like the other
+relevance modes.
+
+Bm25Query scores one document at a time against fixed statistics instead,
+for texts that arrive one by one (item descriptions during enrichment):
+its scores are divided by the query's highest possible score, not the
+pool's best, so a document's score doesn't depend on the others.
+
+Document frequencies come from an IdfTable. Tables are cached by key
+(one IdfCache per SessionManager, passed down to RecommendationService)
+and accumulate documents by ID across calls, so a query
+seen on earlier turns reuses its statistics instead of recounting the same
+items, and rarely-pooled terms get steadier IDFs.
+"""
+
+import math
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from .config import BM25_B, BM25_IDF_CACHE_SIZE, BM25_K1, BM25_MAX_IDF_DOCS
+from .tokenizer import token_stream
+
+# Splits a normalized token into Latin and non-Latin (kana/kanji) runs.
+_RUN_RE = re.compile("[0-9a-z\u00df-\u024f]+|[^0-9a-z\u00df-\u024f]+")
+
+
+@lru_cache(maxsize=8192)
+def bm25_terms(text: str) -> Tuple[str, ...]:
+    """BM25 terms of `text`, repeats included: Latin words and CJK bigrams."""
+    terms: List[str] = []
+    for token in token_stream(text):
+        for run in _RUN_RE.findall(token):
+            if run[0] < "\u3000" or len(run) < 2:
+                terms.append(run)
+            else:
+                terms.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tuple(terms)
+
+
+class IdfTable:
+    """Document frequencies over every distinct document added to it."""
+
+    def __init__(self, max_docs: int = BM25_MAX_IDF_DOCS) -> None:
+        # Past `max_docs` the statistics are considered stable and new documents are ignored.
+        self.max_docs = max_docs
+        self.n_docs = 0
+        self.df: Dict[str, int] = {}
+        self._seen: Set[str] = set()
+
+    def add(self, doc_id: str, terms: Sequence[str]) -> None:
+        if doc_id in self._seen or self.n_docs >= self.max_docs:
+            return
+        self._seen.add(doc_id)
+        self.n_docs += 1
+        df = self.df
+        for term in set(terms):
+            df[term] = df.get(term, 0) + 1
+
+    def idf(self, term: str) -> float:
+        """Okapi IDF with the +1 that keeps it positive for very common terms."""
+        df = self.df.get(term, 0)
+        return math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+
+class IdfCache:
+    """LRU of IdfTables by key (the normalized search keywords)."""
+
+    def __init__(self, max_size: int = BM25_IDF_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._tables: "OrderedDict[Hashable, IdfTable]" = OrderedDict()
+
+    def table(self, key: Hashable) -> IdfTable:
+        table = self._tables.get(key)
+        if table is not None:
+            self.hits += 1
+            self._tables.move_to_end(key)
+            return table
+        self.misses += 1
+        table = self._tables[key] = IdfTable()
+        if len(self._tables) > self.max_size:
+            self._tables.popitem(last=False)
+        return table
+
+    def clear(self) -> None:
+        self._tables.clear()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+
+class Bm25Index:
+    """Inverted index over one pool of texts, scored with BM25."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        idf_table: Optional[IdfTable] = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        self.idf_table = idf_table if idf_table is not None else IdfTable()
+        for idx, (doc_id, text) in enumerate(zip(ids, texts)):
+            terms = bm25_terms(text or "")
+            self.lengths.append(len(terms))
+            self.idf_table.add(doc_id, terms)
+            tf: Dict[str, int] = {}
+            for term in terms:
+                tf[term] = tf.get(term, 0) + 1
+            for term, count in tf.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    self.postings[term] = [(idx, count)]
+                else:
+                    posting.append((idx, count))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def scores(self, query: str) -> List[float]:
+        """BM25 of each document for the query's distinct terms, divided by the best (so in [0, 1])."""
+        scores = [0.0] * len(self.lengths)
+        if not self.avg_length:
+            return scores
+        k1, b = self.k1, self.b
+        # Per-document length normalization, shared by every query term.
+        norms = [k1 * (1.0 - b + b * n / self.avg_length) for n in self.lengths]
+        for term in dict.fromkeys(bm25_terms(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            weight = self.idf_table.idf(term) * (k1 + 1.0)
+            for idx, tf in posting:
+                scores[idx] += weight * tf / (tf + norms[idx])
+        best = max(scores)
+        if best > 0:
+            scores = [score / best for score in scores]
+        return scores
+
+
+class Bm25Query:
+    """A query scored against one document at a time, with IDFs fixed at construction.
+
+    Term frequency saturates as in BM25 but there is no length
+    normalization (the average length would depend on which documents were
+    scored). Scores are divided by the sum of the query terms' weights, the
+    limit as every term's frequency grows, so they fall in [0, 1).
+    """
+
+    def __init__(self, query: str, idf_table: IdfTable, k1: float = BM25_K1) -> None:
+        self.k1 = k1
+        self.weights = {
+            term: idf_table.idf(term) * (k1 + 1.0) for term in dict.fromkeys(bm25_terms(query))
+        }
+        self.max_score = sum(self.weights.values())
+
+    def score(self, text: Optional[str]) -> float:
+        if not self.max_score or not text:
+            return 0.0
+        tf: Dict[str, int] = {}
+        for term in bm25_terms(text):
+            if term in self.weights:
+                tf[term] = tf.get(term, 0) + 1
+        total = sum(self.weights[term] * n / (n + self.k1) for term, n in tf.items())
+        return total / self.max_score
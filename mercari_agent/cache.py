@@ -0,0 +1,237 @@
+"""Caching layers in front of Mercari clients.
+
+Provides:
+- CachedMercariClient: TTL + LRU cache over AbstractMercariClient.search
+- ItemCache: TTL cache of enriched item details, optionally persisted to SQLite
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .config import (
+    ITEM_CACHE_DB_PATH,
+    ITEM_CACHE_MAX_SIZE,
+    ITEM_CACHE_TTL_S,
+    SEARCH_CACHE_MAX_SIZE,
+    SEARCH_CACHE_TTL_S,
+)
+from .models import SearchRequest
+from .recommender import AbstractMercariClient, IncludeFn, shared_search_key
+
+
+class CachedMercariClient(AbstractMercariClient):
+    """Wrap another Mercari client and serve repeated searches from memory.
+
+    Entries are keyed on the normalized SearchRequest and the `include`
+    filter's settings (see shared_search_key), expire after `ttl_s` seconds, and the least recently used entry is evicted
+    once `max_size` is reached. enrich_item is passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        inner: AbstractMercariClient,
+        ttl_s: float = SEARCH_CACHE_TTL_S,
+        max_size: int = SEARCH_CACHE_MAX_SIZE,
+    ) -> None:
+        self.inner = inner
+        self.ttl_s = ttl_s
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Any]]]" = OrderedDict()
+
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        key = shared_search_key(request, limit, include)
+        if key is None:
+            return await self.inner.search(request, limit=limit, include=include)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, items = entry
+            if expires_at > now:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return items
+            # Expired: drop it and fall through to a fresh search.
+            del self._entries[key]
+
+        self.misses += 1
+        items = list(await self.inner.search(request, limit=limit, include=include))
+        self._entries[key] = (time.monotonic() + self.ttl_s, items)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return items
+
+    async def enrich_item(self, raw_item: Any) -> Any:
+        return await self.inner.enrich_item(raw_item)
+
+    def clear(self) -> None:
+        """Drop all cached searches (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size, for logging and metrics."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+
+class ItemCache:
+    """Enriched item details keyed by Mercari item ID.
+
+    Stores the enrichment-only fields RecommendationService extracts from
+    full_item() (seller, condition, shipping, description, category), never the
+    price, which always comes fresh from search. Entries live in an in-memory
+    LRU; when `db_path` is set they are also written through to SQLite so a
+    restarted process starts warm. Expiry uses wall-clock time so it survives
+    restarts. The async get_many/put_many run their SQLite work in a worker
+    thread (one query or transaction per call), off the event loop.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = ITEM_CACHE_TTL_S,
+        max_size: int = ITEM_CACHE_MAX_SIZE,
+        db_path: Optional[str] = ITEM_CACHE_DB_PATH,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # Worker threads share the connection, one statement at a time.
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS items "
+                    "(id TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+                self._db.execute("DELETE FROM items WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Return cached fields for `item_id`, or None if missing or expired."""
+        now = time.time()
+        entry = self._entries.get(item_id)
+        if entry is None and self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT expires_at, payload FROM items WHERE id = ?", (item_id,)
+                ).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._remember(item_id, entry)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                self._entries.pop(item_id, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(item_id)
+        return entry[1]
+
+    async def get_many(self, item_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached fields by ID for the given items that are present and unexpired.
+
+        IDs not in memory are looked up in SQLite with one query, in a worker thread.
+        """
+        now = time.time()
+        item_ids = list(dict.fromkeys(item_ids))
+        if self._db is not None:
+            missing = [item_id for item_id in item_ids if item_id not in self._entries]
+            if missing:
+                for item_id, entry in (await asyncio.to_thread(self._select, missing)).items():
+                    if item_id not in self._entries:
+                        self._remember(item_id, entry)
+        found: Dict[str, Dict[str, Any]] = {}
+        for item_id in item_ids:
+            entry = self._entries.get(item_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._entries.pop(item_id, None)
+                self.misses += 1
+                continue
+            self.hits += 1
+            self._entries.move_to_end(item_id)
+            found[item_id] = entry[1]
+        return found
+
+    async def put_many(self, fields_by_id: Dict[str, Dict[str, Any]]) -> None:
+        """Cache enrichment fields for several items (one SQLite transaction, in a worker thread)."""
+        if not fields_by_id:
+            return
+        expires_at = time.time() + self.ttl_s
+        for item_id, fields in fields_by_id.items():
+            self._remember(item_id, (expires_at, fields))
+        if self._db is not None:
+            rows = [
+                (item_id, expires_at, json.dumps(fields, ensure_ascii=False))
+                for item_id, fields in fields_by_id.items()
+            ]
+            await asyncio.to_thread(self._insert, rows)
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current in-memory size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+    def _remember(self, item_id: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        self._entries[item_id] = entry
+        self._entries.move_to_end(item_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _select(self, item_ids: List[str]) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        """Stored entries for `item_ids` (runs in a worker thread)."""
+        entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Stay under SQLite's default limit on bound parameters per statement.
+        for start in range(0, len(item_ids), 500):
+            chunk = item_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._db_lock:
+                if self._db is None:
+                    break
+                rows = self._db.execute(
+                    f"SELECT id, expires_at, payload FROM items WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+            for item_id, expires_at, payload in rows:
+                entries[item_id] = (expires_at, json.loads(payload))
+        return entries
+
+    def _insert(self, rows: List[Tuple[str, float, str]]) -> None:
+        """Write rows in one transaction (runs in a worker thread)."""
+        with self._db_lock:
+            if self._db is None:
+                return
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO items (id, expires_at, payload) VALUES (?, ?, ?)", rows
+                )
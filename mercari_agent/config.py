@@ -1,8 +1,49 @@
+import os
+
 MODEL_NAME = "gpt-4.1-mini"
-MAX_TURNS = 6 # Maximum number of recent user/assistant turns to keep in context.
+HISTORY_TOKEN_BUDGET = 2000 # Prompt tokens of chat history kept verbatim before older turns are summarized
+HISTORY_SUMMARY_TOKENS = 300 # Max tokens of the rolling summary of compacted turns
 
 MAX_SHALLOW = 120 # Number of raw items to fetch from Mercari API
 MAX_CANDIDATES = 60 # Number of filtered items to enrich and rank out of the raw items
 MAX_RETURN = 10 # Number of products to feed LLM for final recommendation after ranking
 MIN_SELLER_RATING = 0.0 # Minimum seller rating
 
+SEARCH_CACHE_TTL_S = 300.0 # Seconds a cached Mercari search result stays valid
+SEARCH_CACHE_MAX_SIZE = 512 # Maximum cached search results before LRU eviction
+
+ITEM_CACHE_TTL_S = 120.0 # Seconds enriched item details stay valid (keep short so seller/shipping info stays fresh)
+ITEM_CACHE_MAX_SIZE = 5000 # Maximum enriched items kept in memory before LRU eviction
+ITEM_CACHE_DB_PATH = os.environ.get("MERCARI_ITEM_CACHE_DB") # Optional SQLite file to persist enriched items across restarts
+
+LIMITER_INITIAL = 16 # Starting number of concurrent Mercari calls (search + enrichment)
+LIMITER_MIN = 2 # Floor the adaptive limit never drops below
+LIMITER_MAX = 64 # Ceiling the adaptive limit never grows above
+LIMITER_LATENCY_TARGET_S = 2.0 # Calls slower than this count as congestion and shrink the limit
+
+MAX_SELLER_RATING = 5.0 # Highest Mercari seller star rating; bounds the deep score for early stopping
+ENRICH_DEADLINE_S = None # Optional seconds to wait on enrichment before ranking what has arrived (None waits for all)
+SCORING_ENGINE = os.environ.get("MERCARI_SCORING_ENGINE", "python") # "python" or "numpy" (vectorized, needs numpy)
+RELEVANCE_MODE = os.environ.get("MERCARI_RELEVANCE_MODE", "tokens") # Name relevance: "tokens" (query-token substring hits), "ngram" (character n-gram Dice) or "bm25"
+BM25_K1 = 1.2 # BM25 term-frequency saturation
+BM25_B = 0.75 # BM25 document-length normalization
+BM25_DETAIL_WEIGHT = 0.25 # Share of "bm25" relevance that comes from descriptions/categories after enrichment
+BM25_IDF_CACHE_SIZE = 256 # Keyword sets whose document frequencies are kept across turns
+BM25_MAX_IDF_DOCS = 5000 # Documents counted per cached IDF table before its statistics are frozen
+
+SEARCH_PAGE_BUDGET = 3 # Maximum result pages fetched per search candidate
+SEARCH_PAGE_CONCURRENCY = 2 # Result pages requested in parallel when the page token allows it
+
+SESSION_MAX = 1000 # Maximum chat sessions (agents) kept in memory by the server
+SESSION_TTL_S = 1800.0 # Idle seconds before a session is evicted
+SESSION_SPILL_DIR = os.environ.get("MERCARI_SESSION_DIR") # Optional directory to persist evicted session history
+
+FAST_PATH_ENABLED = os.environ.get("MERCARI_FAST_PATH", "1") != "0" # Skip the analyst LLM for simple queries the rule parser understands
+FAST_PATH_MIN_CONFIDENCE = 0.8 # Parser confidence needed to skip the analyst LLM
+
+RENDER_MODE = os.environ.get("MERCARI_RENDER_MODE", "llm") # Search-turn replies: "llm" (presentation call) or "template" (filled locally)
+
+PAYLOAD_TOKEN_BUDGET = 1500 # Max tokens of product JSON sent to the presentation LLM per tool call
+PAYLOAD_DESC_CHARS = 160 # Description characters kept per item before the budget shortens them further
+
+TRACE_SINKS = os.environ.get("MERCARI_TRACE", "") # Comma-separated span sinks to enable: "log", "histogram", "otel"
@@ -0,0 +1,266 @@
+"""Deterministic offline Mercari client for benchmarks and local runs.
+
+FakeMercariClient implements AbstractMercariClient over a synthetic
+catalog generated from a seed: JA/EN product names across a handful of
+categories, per-category price distributions, a pool of sellers with
+skewed ratings, seller/buyer shipping payers and realistic conditions.
+The fake raw items carry only the attributes RecommendationService reads
+from mercapi's SearchResultItem and Item. Latency and error rates can be
+injected so pipeline behaviour under slow or flaky upstreams can be
+measured without hitting mercari.jp.
+"""
+
+import asyncio
+import datetime
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import SearchRequest
+from .recommender import AbstractMercariClient, IncludeFn
+from .tokenizer import tokenize_many
+from .utils import search_request_key, tokenize
+
+# (English name, Japanese name, category, median price JPY)
+_PRODUCTS: List[Tuple[str, str, str, int]] = [
+    ("PS5", "プレイステーション5", "ゲーム機本体", 55000),
+    ("PS5 controller", "PS5 コントローラー", "ゲーム機周辺機器", 6000),
+    ("Nintendo Switch", "ニンテンドースイッチ", "ゲーム機本体", 25000),
+    ("Switch game", "スイッチ ソフト", "ゲームソフト", 3500),
+    ("Sony TV", "ソニー テレビ", "テレビ", 30000),
+    ("smart TV", "スマートテレビ", "テレビ", 25000),
+    ("iPhone 13", "アイフォン13", "スマートフォン本体", 60000),
+    ("AirPods", "エアーポッズ", "イヤフォン", 12000),
+    ("Canon camera", "キヤノン カメラ", "デジタルカメラ", 40000),
+    ("sofa", "ソファ", "ソファ", 15000),
+    ("desk", "デスク", "机", 8000),
+    ("Uniqlo jacket", "ユニクロ ジャケット", "ジャケット", 3000),
+    ("Lego set", "レゴ セット", "おもちゃ", 5000),
+    ("rice cooker", "炊飯器", "キッチン家電", 9000),
+]
+_MODIFIERS = ["本体", "美品", "新品", "中古", "used", "未開封", "箱付き", "限定", "セット", "4K", "ジャンク", "送料無料"]
+_CONDITIONS = [
+    ("新品、未使用", 2),
+    ("未使用に近い", 3),
+    ("目立った傷や汚れなし", 5),
+    ("やや傷や汚れあり", 3),
+    ("傷や汚れあり", 1),
+    ("全体的に状態が悪い", 1),
+]
+_DESCRIPTION_LINES = [
+    "ご覧いただきありがとうございます。",
+    "動作確認済みです。",
+    "自宅保管のため神経質な方はご遠慮ください。",
+    "付属品は写真に写っているものが全てです。",
+    "Used a few times, works perfectly.",
+    "Ships within 2 days, carefully packed.",
+    "No returns, please check the photos.",
+    "即購入OKです。",
+]
+_BASE_DATE = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@dataclass
+class FakeSeller:
+    star_rating_score: int
+    num_sell_items: int
+
+
+@dataclass
+class FakeNamed:
+    """Stands in for mercapi's ItemCondition and ItemCategorySummary."""
+
+    name: str
+
+
+@dataclass
+class FakeShippingPayer:
+    code: str  # "seller" | "buyer"
+
+
+@dataclass
+class FakeShippingDuration:
+    min_days: int
+    max_days: int
+
+
+@dataclass
+class FakeItem:
+    """Full item details, shaped like mercapi's Item."""
+
+    id_: str
+    name: str
+    price: int
+    created: Optional[datetime.datetime]
+    seller: Optional[FakeSeller]
+    item_condition: Optional[FakeNamed]
+    item_category: Optional[FakeNamed]
+    shipping_payer: Optional[FakeShippingPayer]
+    shipping_duration: Optional[FakeShippingDuration]
+    description: Optional[str]
+
+
+@dataclass
+class FakeSearchItem:
+    """Search result, shaped like mercapi's SearchResultItem."""
+
+    id_: str
+    name: str
+    price: int
+    created: Optional[datetime.datetime]
+    item_type: Optional[str] = "ITEM_TYPE_MERCARI"
+    detail: Optional[FakeItem] = field(default=None, repr=False)
+
+    async def full_item(self) -> Optional[FakeItem]:
+        return self.detail
+
+
+def _lognormal_price(rng: random.Random, median: int) -> int:
+    price = median * math.exp(rng.gauss(0.0, 0.45))
+    return max(300, int(round(price, -1)))
+
+
+def generate_catalog(size: int, seed: int = 0) -> List[FakeSearchItem]:
+    """Synthetic listings with attached details; same seed, same catalog."""
+    rng = random.Random(seed)
+    sellers = [
+        FakeSeller(
+            star_rating_score=rng.choices([5, 4, 3, 2], weights=[70, 20, 7, 3])[0],
+            num_sell_items=int(math.exp(rng.uniform(0, 7))),
+        )
+        for _ in range(max(1, size // 20))
+    ]
+    conditions, condition_weights = zip(*_CONDITIONS)
+    catalog: List[FakeSearchItem] = []
+    for i in range(size):
+        en, ja, category, median = rng.choice(_PRODUCTS)
+        base = rng.choice([en, ja, f"{ja} {en}"])
+        name = " ".join([base, *rng.sample(_MODIFIERS, rng.randint(0, 3))])
+        created = _BASE_DATE - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 180))
+        min_days = rng.choice([1, 2, 4])
+        detail = FakeItem(
+            id_=f"m{seed % 100:02d}{i:09d}",
+            name=name,
+            price=_lognormal_price(rng, median),
+            created=created,
+            seller=rng.choice(sellers),
+            item_condition=FakeNamed(rng.choices(conditions, weights=condition_weights)[0]),
+            item_category=FakeNamed(category),
+            shipping_payer=FakeShippingPayer("seller" if rng.random() < 0.7 else "buyer"),
+            shipping_duration=FakeShippingDuration(min_days, min_days + rng.choice([1, 2, 3])),
+            description="\n".join(rng.choices(_DESCRIPTION_LINES, k=rng.randint(1, 6))),
+        )
+        catalog.append(
+            FakeSearchItem(
+                id_=detail.id_, name=name, price=detail.price, created=created, detail=detail
+            )
+        )
+    # Mercari's default search order is newest first.
+    catalog.sort(key=lambda item: item.created, reverse=True)
+    return catalog
+
+
+class FakeMercariClient(AbstractMercariClient):
+    """Offline AbstractMercariClient over a seeded synthetic catalog.
+
+    search() returns, newest first, the catalog items whose name shares a
+    token with the query and that pass the price/shipping filters Mercari
+    would apply server-side; like MercapiClient it keeps going until
+    `limit` items pass `include`. Queries that match nothing get a
+    deterministic sample of the catalog, so every search yields a pool.
+
+    `search_latency_s` / `enrich_latency_s` are mean delays (exponentially
+    distributed); `search_error_rate` makes search raise, and
+    `enrich_error_rate` makes enrich_item return None, as MercapiClient does
+    for failed fetches. `enrichments` counts fetches that ran to completion;
+    ones cancelled mid-delay (early stop, deadline) aren't counted.
+    """
+
+    def __init__(
+        self,
+        catalog_size: int = 20000,
+        seed: int = 0,
+        search_latency_s: float = 0.0,
+        enrich_latency_s: float = 0.0,
+        search_error_rate: float = 0.0,
+        enrich_error_rate: float = 0.0,
+    ) -> None:
+        self.catalog = generate_catalog(catalog_size, seed)
+        self.seed = seed
+        self.search_latency_s = search_latency_s
+        self.enrich_latency_s = enrich_latency_s
+        self.search_error_rate = search_error_rate
+        self.enrich_error_rate = enrich_error_rate
+        self.searches = 0
+        self.enrichments = 0
+        self.errors = 0
+        # Latency/error draws come from their own stream so they don't shift the catalog.
+        self._rng = random.Random(seed + 1)
+        self._name_tokens = [set(tokens) for tokens in tokenize_many(item.name for item in self.catalog)]
+        self._matches: Dict[Any, List[FakeSearchItem]] = {}
+
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        self.searches += 1
+        await self._delay(self.search_latency_s)
+        if self._rng.random() < self.search_error_rate:
+            self.errors += 1
+            raise RuntimeError("injected search failure")
+
+        items: List[FakeSearchItem] = []
+        accepted = 0
+        for item in self._matching(request):
+            items.append(item)
+            if include is None or include(item):
+                accepted += 1
+                if accepted >= limit:
+                    break
+        return items
+
+    async def enrich_item(self, raw_item: Any) -> Any:
+        await self._delay(self.enrich_latency_s)
+        self.enrichments += 1
+        if self._rng.random() < self.enrich_error_rate:
+            self.errors += 1
+            return None
+        return await raw_item.full_item()
+
+    async def _delay(self, mean_s: float) -> None:
+        if mean_s > 0:
+            await asyncio.sleep(self._rng.expovariate(1.0 / mean_s))
+
+    def _matching(self, request: SearchRequest) -> List[FakeSearchItem]:
+        key = search_request_key(request, 0)
+        matches = self._matches.get(key)
+        if matches is not None:
+            return matches
+
+        tokens = set(tokenize(request.query_text))
+        candidates = [
+            item for item, names in zip(self.catalog, self._name_tokens) if tokens & names
+        ]
+        if not candidates:
+            rng = random.Random(f"{self.seed}:{request.query_text}")
+            candidates = sorted(
+                rng.sample(self.catalog, min(len(self.catalog), 600)),
+                key=lambda item: item.created,
+                reverse=True,
+            )
+
+        payer = {"seller_pays": "seller", "buyer_pays": "buyer"}.get(
+            request.shipping_preference or ""
+        )
+        matches = [
+            item
+            for item in candidates
+            if (request.min_price is None or item.price >= request.min_price)
+            and (request.max_price is None or item.price <= request.max_price)
+            and (payer is None or item.detail.shipping_payer.code == payer)
+        ]
+        self._matches[key] = matches
+        return matches
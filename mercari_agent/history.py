@@ -0,0 +1,156 @@
+"""Token-budgeted conversation history.
+
+Keeps recent user/assistant turns verbatim as long as they fit
+HISTORY_TOKEN_BUDGET. Older turns are compacted into a short rolling
+summary: one line per turn with the user's request, the constraints it set
+(budget, shipping) and the IDs of the items shown in the reply. The summary
+is sent as a message after the fixed system prompt, so the system prefix
+stays byte-identical across turns and provider-side prompt caching keeps
+hitting.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from .config import HISTORY_SUMMARY_TOKENS, HISTORY_TOKEN_BUDGET
+from .intent import parse_intent
+from .token_count import count_tokens
+
+# Per-message framing overhead in chat-format prompts (role, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_HEADER = "Summary of earlier turns in this conversation (oldest first):"
+
+_ITEM_ID_RE = re.compile(r"jp\.mercari\.com/item/(m\d+)")
+_WS_RE = re.compile(r"\s+")
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Prompt tokens for one chat message (content plus framing)."""
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    text = _WS_RE.sub(" ", text).strip()
+    return text if len(text) <= max_chars else text[: max_chars - 1].rstrip() + "…"
+
+
+def summarize_turn(user_msg: Dict[str, Any], assistant_msg: Dict[str, Any]) -> str:
+    """One-line digest of a turn: request, constraints and shown item IDs."""
+    user_text = user_msg.get("content") or ""
+    reply = assistant_msg.get("content") or ""
+    parts = [f"User: {_shorten(user_text, 100)}"]
+
+    intent = parse_intent(user_text)
+    constraints: List[str] = []
+    if intent.min_price is not None:
+        constraints.append(f"min {intent.min_price} JPY")
+    if intent.max_price is not None:
+        constraints.append(f"max {intent.max_price} JPY")
+    if intent.shipping_preference:
+        constraints.append(intent.shipping_preference)
+    if constraints:
+        parts.append("constraints: " + ", ".join(constraints))
+
+    item_ids = list(dict.fromkeys(_ITEM_ID_RE.findall(reply)))
+    if item_ids:
+        parts.append("shown items: " + ", ".join(item_ids))
+    elif reply:
+        parts.append(f"Assistant: {_shorten(reply, 100)}")
+    return "- " + " | ".join(parts)
+
+
+class HistoryManager:
+    """Recent turns verbatim plus a rolling summary of older ones.
+
+    `messages` holds user/assistant pairs; once they (with the summary)
+    exceed `token_budget`, the oldest pairs move into `summary`, always
+    keeping the latest `min_recent_turns` turns verbatim. The summary drops
+    its oldest lines past `summary_tokens`.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_tokens: int = HISTORY_SUMMARY_TOKENS,
+        min_recent_turns: int = 1,
+    ) -> None:
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.min_recent_turns = min_recent_turns
+        self.messages: List[Dict[str, Any]] = []
+        self.summary: List[str] = []
+        # Token counts parallel to `messages`, so totals don't re-measure anything.
+        self._counts: List[int] = []
+        self._summary_message: Optional[Dict[str, Any]] = None
+        self._summary_count = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __bool__(self) -> bool:
+        return bool(self.messages or self.summary)
+
+    def append_turn(self, user_msg: Dict[str, Any], assistant_msg: Dict[str, Any]) -> None:
+        """Record a finished turn, then compact to fit the budget."""
+        for message in (user_msg, assistant_msg):
+            self.messages.append(message)
+            self._counts.append(message_tokens(message))
+        self._compact()
+
+    def prompt_messages(self) -> List[Dict[str, Any]]:
+        """History to place after the system prompt: summary (if any), then recent turns."""
+        if self._summary_message is None:
+            return list(self.messages)
+        return [self._summary_message, *self.messages]
+
+    def tokens(self) -> int:
+        """Prompt tokens of prompt_messages()."""
+        return self._summary_count + sum(self._counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe state, for persisting a session."""
+        return {"summary": list(self.summary), "messages": list(self.messages)}
+
+    @classmethod
+    def from_dict(cls, data: Any, **kwargs: Any) -> "HistoryManager":
+        """Inverse of to_dict. A plain message list (the old format) is also accepted."""
+        history = cls(**kwargs)
+        if isinstance(data, list):
+            messages, summary = data, []
+        elif isinstance(data, dict):
+            messages, summary = data.get("messages") or [], data.get("summary") or []
+        else:
+            return history
+        history.summary = [line for line in summary if isinstance(line, str)]
+        history._refresh_summary()
+        messages = [m for m in messages if isinstance(m, dict)]
+        # Re-pair user/assistant messages; a dangling one is dropped.
+        for user_msg, assistant_msg in zip(messages[::2], messages[1::2]):
+            history.messages.extend([user_msg, assistant_msg])
+            history._counts.extend([message_tokens(user_msg), message_tokens(assistant_msg)])
+        history._compact()
+        return history
+
+    def _compact(self) -> None:
+        keep = 2 * self.min_recent_turns
+        while len(self.messages) > keep and self.tokens() > self.token_budget:
+            user_msg, assistant_msg = self.messages[0], self.messages[1]
+            del self.messages[:2]
+            del self._counts[:2]
+            self.summary.append(summarize_turn(user_msg, assistant_msg))
+            self._refresh_summary()
+            while len(self.summary) > 1 and self._summary_count > self.summary_tokens:
+                del self.summary[0]
+                self._refresh_summary()
+
+    def _refresh_summary(self) -> None:
+        if not self.summary:
+            self._summary_message = None
+            self._summary_count = 0
+            return
+        self._summary_message = {
+            "role": "system",
+            "content": "\n".join([SUMMARY_HEADER, *self.summary]),
+        }
+        self._summary_count = message_tokens(self._summary_message)
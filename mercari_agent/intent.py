@@ -0,0 +1,194 @@
+"""Rule-based intent parser for the analyst fast path.
+
+Handles simple product searches ("PS5 under 50000 yen seller pays
+shipping", "ソニー テレビ 3万円以下 送料込み") without an LLM round trip:
+extracts keywords, a JPY budget and a shipping preference, and reports a
+confidence. Anything it can't map to SearchRequest fields (condition, age,
+location, bundles, follow-ups, questions) lowers the confidence so the
+agent falls back to the analyst LLM.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+_NUM = r"\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?"
+_UNIT = r"(?:円|yen|jpy)"
+
+# Mercari's lowest allowed listing price; a smaller "lower bound" is part of a name ("Switch 2").
+_MIN_LISTING_PRICE = 300
+
+# "10,000-20,000 yen", "between 1万 and 2万円". `lo` can't continue a word or
+# number ("PS5 〜5万円" is not a 5-50000 range).
+_RANGE_RE = re.compile(
+    rf"(?:between\s+)?[¥]?(?<![A-Za-z0-9.,])(?P<lo>{_NUM})\s*(?P<lok>k|万)?\s*{_UNIT}?\s*(?:-|~|〜|to|and)\s*"
+    rf"[¥]?(?P<hi>{_NUM})\s*(?P<hik>k|万)?\s*{_UNIT}",
+    re.IGNORECASE,
+)
+# "¥30,000", "30k yen", "5万円", "50,000 JPY", "3万", "under 50k" (a bare "k" amount
+# only counts after a price qualifier, so "4K TV" stays a keyword)
+_AMOUNT_RE = re.compile(
+    rf"[¥]\s*(?P<a>{_NUM})\s*(?P<ak>k|万)?"
+    rf"|(?<![A-Za-z0-9.,])(?P<b>{_NUM})\s*(?P<bk>k|万)?\s*{_UNIT}"
+    rf"|(?<![A-Za-z0-9.,])(?P<c>{_NUM})\s*(?P<ck>万|k(?![a-z]))",
+    re.IGNORECASE,
+)
+_MAX_BEFORE_RE = re.compile(
+    r"(?:under|below|less than|up to|max(?:imum)?|within|at most|no more than|budget(?: of| is)?"
+    r"|around|about|approx(?:imately)?|~|〜|-)\s*$",
+    re.IGNORECASE,
+)
+_MIN_BEFORE_RE = re.compile(r"(?:over|above|more than|at least|from|min(?:imum)?)\s*$", re.IGNORECASE)
+_MAX_AFTER_RE = re.compile(r"^\s*(?:以下|以内|まで|未満)")
+_MIN_AFTER_RE = re.compile(r"^\s*(?:以上|から)")
+
+_SELLER_PAYS_RE = re.compile(
+    r"seller\s+pays(?:\s+for)?(?:\s+the)?\s+shipping|seller[- ]paid\s+shipping|free\s+shipping"
+    r"|shipping\s+(?:is\s+)?(?:included|incl\.?|free)"
+    r"|(?:don't|do not|dont|doesn't)\s+want\s+to\s+pay\s+(?:for\s+)?(?:the\s+)?shipping(?:\s+(?:costs?|fees?))?"
+    r"|no\s+shipping\s+(?:fees?|costs?)|送料込み?|送料無料|出品者負担",
+    re.IGNORECASE,
+)
+_BUYER_PAYS_RE = re.compile(r"buyer\s+pays(?:\s+for)?(?:\s+the)?\s+shipping|着払い|購入者負担", re.IGNORECASE)
+
+_LEAD_RE = re.compile(
+    r"^(?:please\s+)?(?:can\s+you\s+)?(?:help\s+me\s+)?"
+    r"(?:find(?:\s+me)?|search(?:\s+for)?|show\s+me|get\s+me"
+    r"|i(?:'m|\s+am)\s+looking\s+for|looking\s+for"
+    r"|i\s+(?:want|need|would\s+like|'d\s+like)(?:\s+to\s+(?:buy|get|find))?|i'd\s+like|want|need|buy)\s+",
+    re.IGNORECASE,
+)
+_STOPWORDS = {
+    "a", "an", "the", "some", "any", "for", "me", "my", "please", "under", "below", "less", "than",
+    "up", "to", "max", "budget", "around", "about", "of", "yen", "jpy", "is", "and", "price",
+    "priced", "if", "possible", "one", "each", "i", "円", "以下", "以内", "まで",
+}
+# Constraints the SearchRequest can't express, or signs the turn needs conversation context.
+_UNMAPPED_RES = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\bcondition\b|\b(?:used|unused|new|mint|excellent|damage[sd]?|cracked|scratch(?:es|ed)?|broken|working)\b",
+        r"\bold\b|\bnewer\b|\byears?\b|\bmade\s+in\b|\brecent\b",
+        r"\bnear\b|\bpick\s*up\b|\bdeliver|\bin\s+the\s+next\b",
+        r"\bwith\b|\bincluding\b|\bincluded\b|\bat\s+least\b|\bor\b|\bsize\b|\bgb\b|\bram\b|\bbundle\b|\bset\b",
+        r"\bpreferabl[ey]\b|\bideal(?:ly)?\b|\bprefer(?:red)?\b|\bsimilar\b|\bonly\b|\bnot\b|\bno\b|\bbut\b",
+        r"\b(?:that|those|these|it|them|cheaper|another|other|more|first|second|third)\b",
+        r"\?|\b(?:how|what|why|which|when|where|should|could)\b",
+    )
+]
+_MAX_KEYWORD_WORDS = 4
+
+
+@dataclass
+class ParsedIntent:
+    """Search parameters extracted from one user message."""
+
+    keywords: str
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    shipping_preference: Optional[str] = None
+    confidence: float = 0.0
+    reasons: List[str] = field(default_factory=list)  # why confidence was lowered
+
+
+
+def _amount(num: str, unit: Optional[str]) -> int:
+    value = float(num.replace(",", ""))
+    if unit and unit.lower() == "k":
+        value *= 1000
+    elif unit == "万":
+        value *= 10000
+    return int(round(value))
+
+
+def _cut(text: str, span: Tuple[int, int]) -> str:
+    return text[: span[0]] + " " + text[span[1] :]
+
+
+def parse_intent(text: str) -> ParsedIntent:
+    """Parse a user message into keywords, JPY budget and shipping preference."""
+    norm = unicodedata.normalize("NFKC", text).strip()
+    rest = norm
+    reasons: List[str] = []
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    shipping: Optional[str] = None
+
+    for match in _RANGE_RE.finditer(rest):
+        hi = _amount(match.group("hi"), match.group("hik"))
+        lo = _amount(match.group("lo"), match.group("lok"))
+        # "1-2万円": the upper unit carries over to a unitless lower number,
+        # unless that would put it above the upper one ("15 ~3万円").
+        if not match.group("lok") and match.group("hik"):
+            carried = _amount(match.group("lo"), match.group("hik"))
+            if carried <= hi:
+                lo = carried
+        if lo < _MIN_LISTING_PRICE:
+            continue  # a model number, not a price ("Switch 2 - 30000円")
+        min_price, max_price = lo, hi
+        rest = _cut(rest, match.span())
+        break
+
+    amounts = [
+        match
+        for match in _AMOUNT_RE.finditer(rest)
+        if (match.group("ck") or "").lower() != "k"
+        or _MAX_BEFORE_RE.search(rest[: match.start()])
+        or _MIN_BEFORE_RE.search(rest[: match.start()])
+    ]
+    if len(amounts) > 1:
+        reasons.append("several prices")
+    for match in reversed(amounts):
+        num = match.group("a") or match.group("b") or match.group("c")
+        value = _amount(num, match.group("ak") or match.group("bk") or match.group("ck"))
+        before, after = rest[: match.start()], rest[match.end() :]
+        qualifier = _MAX_BEFORE_RE.search(before) or _MIN_BEFORE_RE.search(before)
+        if _MIN_BEFORE_RE.search(before) or _MIN_AFTER_RE.match(after):
+            min_price = value
+        else:
+            # Plain amounts ("PS5 50000円") are read as a budget.
+            max_price = value
+        after_q = _MAX_AFTER_RE.match(after) or _MIN_AFTER_RE.match(after)
+        start = qualifier.start() if qualifier else match.start()
+        end = match.end() + (after_q.end() if after_q else 0)
+        rest = _cut(rest, (start, end))
+
+    for regex, preference in ((_SELLER_PAYS_RE, "seller_pays"), (_BUYER_PAYS_RE, "buyer_pays")):
+        match = regex.search(rest)
+        if match:
+            shipping = shipping or preference
+            rest = _cut(rest, match.span())
+
+    rest = _LEAD_RE.sub("", rest.strip(" .,!、。"))
+    for regex in _UNMAPPED_RES:
+        if regex.search(rest):
+            reasons.append(f"unmapped: {regex.search(rest).group(0).strip()}")
+
+    words = [
+        w
+        for w in re.split(r"[\s,.!、。]+", rest)
+        if w and w.lower() not in _STOPWORDS and not re.fullmatch(r"(?:to|buy|get)", w, re.IGNORECASE)
+    ]
+    keywords = " ".join(words)
+
+    if not keywords:
+        reasons.append("no keywords")
+    elif len(words) > _MAX_KEYWORD_WORDS:
+        reasons.append("long description")
+    if max_price is None and min_price is None:
+        # Without a budget, short messages are as likely chit-chat as product searches.
+        reasons.append("no budget")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        reasons.append("minimum price above maximum")
+
+    confidence = 0.0 if not keywords else max(0.0, 1.0 - 0.5 * len(reasons))
+    return ParsedIntent(
+        keywords=keywords,
+        min_price=min_price,
+        max_price=max_price,
+        shipping_preference=shipping,
+        confidence=confidence,
+        reasons=reasons,
+    )
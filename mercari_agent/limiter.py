@@ -0,0 +1,123 @@
+"""Adaptive concurrency limiter for Mercari API calls.
+
+AIMD (additive increase, multiplicative decrease): every fast, successful
+call grows the limit by about one slot per limit's worth of calls, while an
+error or a call slower than the latency target halves it. Decreases are
+rate-limited to one per cooldown so a burst of failures from the same
+window only backs off once.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from .config import LIMITER_INITIAL, LIMITER_LATENCY_TARGET_S, LIMITER_MAX, LIMITER_MIN
+
+
+class AdaptiveLimiter:
+    """Shared concurrency limit for Mercari search and enrichment calls."""
+
+    def __init__(
+        self,
+        initial: int = LIMITER_INITIAL,
+        min_limit: int = LIMITER_MIN,
+        max_limit: int = LIMITER_MAX,
+        latency_target_s: float = LIMITER_LATENCY_TARGET_S,
+        backoff: float = 0.5,
+        cooldown_s: Optional[float] = None,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_s = latency_target_s
+        self.backoff = backoff
+        self.cooldown_s = latency_target_s if cooldown_s is None else cooldown_s
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.successes = 0
+        self.errors = 0
+        self.decreases = 0
+        self.latency_ewma_s = 0.0
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @asynccontextmanager
+    async def slot(self, count_errors: bool = True) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of a Mercari call.
+
+        Exceptions raised inside the block count as errors unless
+        `count_errors` is False (for calls expected to fail, such as guessed
+        pages past the end of a result set); cancellation releases the slot
+        without affecting the limit.
+        """
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            if count_errors:
+                self._record(time.monotonic() - start, ok=False)
+            raise
+        else:
+            self._record(time.monotonic() - start, ok=True)
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled; give it back.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def metrics(self) -> Dict[str, float]:
+        """Current limit, in-flight calls, queue depth and outcome counters."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "successes": self.successes,
+            "errors": self.errors,
+            "decreases": self.decreases,
+            "latency_ewma_s": self.latency_ewma_s,
+        }
+
+    def _record(self, latency_s: float, ok: bool) -> None:
+        self.latency_ewma_s = latency_s if not self.latency_ewma_s else (
+            0.8 * self.latency_ewma_s + 0.2 * latency_s
+        )
+        if ok:
+            self.successes += 1
+        else:
+            self.errors += 1
+
+        if not ok or latency_s > self.latency_target_s:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown_s:
+                self._last_decrease = now
+                self.decreases += 1
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
@@ -0,0 +1,51 @@
+"""Aho–Corasick multi-pattern matcher for relevance scoring.
+
+TokenMatcher compiles the relevance tokens of one recommend() call into a
+single automaton (pyahocorasick), so each item name is scanned once instead
+of once per token. Without pyahocorasick it falls back to one substring
+check per token, which is the fastest option in pure CPython. Both paths
+count hits with plain substring semantics (`token in text`).
+"""
+
+from collections import Counter
+from typing import List, Sequence, Set
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:
+    ahocorasick = None  # type: ignore
+
+
+class TokenMatcher:
+    """Count how many of a fixed token list occur as substrings of a text."""
+
+    def __init__(self, tokens: Sequence[str]) -> None:
+        # A token listed twice counts twice, matching `sum(1 for t in tokens if t in text)`.
+        weights = Counter(t for t in tokens if t)
+        self.patterns: List[str] = list(weights)
+        self._weights: List[int] = [weights[t] for t in self.patterns]
+        self._total = sum(self._weights)
+
+        self._automaton = None
+        if ahocorasick is not None and self.patterns:
+            self._automaton = ahocorasick.Automaton()
+            for idx, pattern in enumerate(self.patterns):
+                self._automaton.add_word(pattern, idx)
+            self._automaton.make_automaton()
+
+    def count_hits(self, text: str) -> int:
+        """Weighted number of tokens that occur in `text`."""
+        if not self.patterns or not text:
+            return 0
+        if self._automaton is None:
+            return sum(w for pattern, w in zip(self.patterns, self._weights) if pattern in text)
+        found = self.matches(text)
+        if len(found) == len(self.patterns):
+            return self._total
+        return sum(self._weights[idx] for idx in found)
+
+    def matches(self, text: str) -> Set[int]:
+        """Indices (into `patterns`) of every token that occurs in `text`."""
+        if self._automaton is None:
+            return {idx for idx, pattern in enumerate(self.patterns) if pattern in text}
+        return {idx for _end, idx in self._automaton.iter(text)}
@@ -0,0 +1,121 @@
+"""Process metrics in the Prometheus text exposition format.
+
+Counters (enrichment failures, LLM calls and token usage) are plain dict
+updates made on the event loop thread; /metrics reads them together with
+gauges taken from the live objects at scrape time (session count, cache
+stats, limiter state) and the per-stage latency histograms collected by a
+tracing.HistogramSink. Nothing here takes a lock.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import tracing
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_COUNTERS: Dict[str, str] = {
+    "mercari_enrich_failures_total": "Item detail fetches that failed and were skipped.",
+    "mercari_llm_calls_total": "Chat completion calls by step.",
+    "mercari_llm_tokens_total": "Chat completion tokens by step and type (prompt/completion).",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+_values: Dict[str, Dict[LabelKey, float]] = {name: {} for name in _COUNTERS}
+
+# Per-stage latency histograms; fed by tracing spans once enabled.
+stage_histograms = tracing.HistogramSink()
+
+
+def enable_stage_histograms() -> None:
+    """Start collecting stage latencies from tracing spans (idempotent)."""
+    if stage_histograms not in tracing.sinks():
+        tracing.add_sink(stage_histograms)
+
+
+def inc(name: str, amount: float = 1.0, **labels: str) -> None:
+    """Add `amount` to counter `name` with the given labels."""
+    series = _values[name]
+    key = tuple(sorted(labels.items()))
+    series[key] = series.get(key, 0.0) + amount
+
+
+def record_llm_usage(step: str, usage: Any) -> None:
+    """Count one LLM call and its token usage (usage may be None, e.g. for some streams)."""
+    inc("mercari_llm_calls_total", step=step)
+    if usage is None:
+        return
+    inc("mercari_llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, step=step, type="prompt")
+    inc("mercari_llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, step=step, type="completion")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: LabelKey) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _gauges(sessions: Any) -> Dict[str, Tuple[str, List[Tuple[LabelKey, float]]]]:
+    """Gauge families read from the live session manager, client and caches."""
+    families: Dict[str, Tuple[str, List[Tuple[LabelKey, float]]]] = {
+        "mercari_active_sessions": ("Chat sessions held in memory.", [((), len(sessions))]),
+        "mercari_cache_hit_ratio": ("Hit ratio per cache since start.", []),
+        "mercari_cache_entries": ("Entries held per cache.", []),
+    }
+    client = sessions.mercari_client
+    caches = [("search", client), ("item", sessions.item_cache)]
+    for cache_name, cache in caches:
+        if cache is not None and hasattr(cache, "stats"):
+            stats = cache.stats()
+            families["mercari_cache_hit_ratio"][1].append(((("cache", cache_name),), stats["hit_ratio"]))
+            families["mercari_cache_entries"][1].append(((("cache", cache_name),), stats["size"]))
+    limiter = getattr(getattr(client, "inner", client), "limiter", None)
+    if limiter is not None:
+        state = limiter.metrics()
+        families["mercari_inflight_requests"] = ("Mercari API calls in flight.", [((), state["in_flight"])])
+        families["mercari_limiter_limit"] = ("Current adaptive concurrency limit.", [((), state["limit"])])
+        families["mercari_limiter_queue_depth"] = (
+            "Mercari API calls waiting for a limiter slot.",
+            [((), state["queue_depth"])],
+        )
+    return families
+
+
+def render(sessions: Optional[Any] = None) -> str:
+    """Metrics text for a scrape; `sessions` is the server's SessionManager."""
+    lines: List[str] = []
+
+    snapshot = stage_histograms.snapshot()
+    if snapshot:
+        name = "mercari_stage_duration_seconds"
+        lines.append(f"# HELP {name} Latency of each turn stage (see tracing spans).")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, hist in sorted(snapshot.items()):
+            for le, count in hist["buckets"]:
+                lines.append(f"{name}_bucket{_labels((('stage', stage), ('le', _number(le))))} {count}")
+            lines.append(f"{name}_sum{_labels((('stage', stage),))} {_number(hist['sum'])}")
+            lines.append(f"{name}_count{_labels((('stage', stage),))} {hist['count']}")
+
+    for name, help_text in _COUNTERS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for key, value in list(_values[name].items()):
+            lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+    if sessions is not None:
+        for name, (help_text, samples) in _gauges(sessions).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in samples:
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+    return "\n".join(lines) + "\n"
@@ -19,9 +19,13 @@ class SearchRequest:
     brand: Optional[str] = None  # brand name filter
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductShallow:
-    """Lightweight product from Mercari search."""
+    """Lightweight product from Mercari search.
+
+    Slotted (no per-instance __dict__): thousands are pooled per turn. Use
+    dataclasses.fields() rather than __dict__ to copy one.
+    """
     id: str
     name: str
     price_jpy: int
@@ -33,7 +37,7 @@ class ProductShallow:
     created_at: Optional[str] = None  # ISO8601 string
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductFull(ProductShallow):
     """Full product details for ranking and presentation."""
     description: Optional[str] = None
@@ -0,0 +1,69 @@
+"""Character n-gram relevance for item names.
+
+Japanese titles rarely contain spaces ("ソニースマートテレビ24型"), so
+whole-token matching either misses or matches by accident. NgramIndex
+breaks each normalized name into character bigrams and trigrams, builds
+a gram -> item posting list over the pooled items, and scores a query by
+the Dice overlap of the two gram sets, 2|Q∩D| / (|Q| + |D|), accumulating
+|Q∩D| in one pass over the query grams' postings.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from .tokenizer import tokenize
+
+NGRAM_SIZES: Tuple[int, ...] = (2, 3)
+
+
+@lru_cache(maxsize=65536)
+def char_ngrams(text: str, sizes: Tuple[int, ...] = NGRAM_SIZES) -> FrozenSet[str]:
+    """Bigrams/trigrams of each normalized token of `text`.
+
+    Grams never span tokens; a token shorter than the smallest size is kept
+    whole so single-kanji words still count.
+    """
+    grams = set()
+    for token in tokenize(text):
+        if len(token) < sizes[0]:
+            grams.add(token)
+            continue
+        for n in sizes:
+            grams.update(token[i : i + n] for i in range(len(token) - n + 1))
+    return frozenset(grams)
+
+
+class NgramIndex:
+    """Posting lists from n-gram to item position, for one pool of names."""
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.postings: Dict[str, List[int]] = {}
+        self.sizes: List[int] = []
+        for idx, name in enumerate(names):
+            grams = char_ngrams(name or "")
+            self.sizes.append(len(grams))
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    self.postings[gram] = [idx]
+                else:
+                    posting.append(idx)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def dice_scores(self, query: str) -> List[float]:
+        """Dice coefficient between the query's grams and each item's grams, in [0, 1]."""
+        query_grams = char_ngrams(query)
+        scores = [0.0] * len(self.sizes)
+        if not query_grams:
+            return scores
+        overlap = [0] * len(self.sizes)
+        for gram in query_grams:
+            for idx in self.postings.get(gram, ()):
+                overlap[idx] += 1
+        n_query = len(query_grams)
+        for idx, count in enumerate(overlap):
+            if count:
+                scores[idx] = 2.0 * count / (n_query + self.sizes[idx])
+        return scores
@@ -0,0 +1,112 @@
+"""Compact get_recommendations tool payload for the presentation prompt.
+
+The presentation LLM only needs enough of each product to pick and
+justify the top 3, so instead of dumping every ProductFull field this
+builds short-keyed JSON: null fields are dropped, descriptions are cut
+down, and trailing (lowest-ranked) items are trimmed until the payload
+fits a token budget. PAYLOAD_KEY_LEGEND explains the keys to the model.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .config import PAYLOAD_DESC_CHARS, PAYLOAD_TOKEN_BUDGET
+from .models import ProductFull
+from .token_count import count_tokens
+from .utils import dumps_str, product_url, serialize_product
+
+# Appended to the presentation system prompt; keep in sync with _compact_item.
+PAYLOAD_KEY_LEGEND = (
+    "Tool results are JSON lists of products ranked best first, with short keys: "
+    "n=name, p=price in JPY, u=URL, r=seller rating (0-5), s=seller listings count, "
+    "c=condition, ship=1 if the seller pays shipping else 0, days=shipping days, "
+    "cat=category, d=description excerpt. Missing keys are unknown.\n"
+)
+
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass
+class PayloadStats:
+    """Token counts of the full (serialize_product) and compact payloads.
+
+    `tokens_before` is only measured when build_tool_payload(baseline=True).
+    """
+
+    tokens_before: Optional[int]
+    tokens_after: int
+    items_before: int
+    items_after: int
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    text = _WS_RE.sub(" ", text).strip()
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 1].rstrip() + "…"
+
+
+def _compact_item(p: ProductFull, desc_chars: int) -> Dict[str, Any]:
+    item: Dict[str, Any] = {
+        "n": p.name,
+        "p": p.price_jpy,
+        "u": product_url(p),
+        "r": p.seller_rating,
+        "s": p.seller_sales_count,
+        "c": p.condition_label,
+        "ship": None if p.shipping_fee_included is None else int(p.shipping_fee_included),
+        "days": (
+            f"{p.shipping_days_min}-{p.shipping_days_max}"
+            if p.shipping_days_min is not None and p.shipping_days_max is not None
+            else None
+        ),
+        "cat": p.category,
+        "d": _shorten(p.description, desc_chars) if p.description and desc_chars > 0 else None,
+    }
+    return {k: v for k, v in item.items() if v is not None}
+
+
+def build_tool_payload(
+    products: Sequence[ProductFull],
+    token_budget: int = PAYLOAD_TOKEN_BUDGET,
+    desc_chars: int = PAYLOAD_DESC_CHARS,
+    baseline: bool = False,
+) -> Tuple[str, PayloadStats]:
+    """Serialize ranked products for the tool message within `token_budget`.
+
+    Descriptions are shortened first (halving down to none), then the
+    lowest-ranked items are dropped. The top item is always kept.
+    Returns the JSON string and token/item counts; with `baseline`, the
+    stats also measure the full serialize_product dump this replaces.
+    """
+    tokens_before = None
+    if baseline:
+        tokens_before = count_tokens(dumps_str([serialize_product(p) for p in products]))
+
+    def render(items: Sequence[ProductFull], chars: int) -> str:
+        return dumps_str([_compact_item(p, chars) for p in items])
+
+    # Shorten descriptions first...
+    chars = desc_chars
+    content = render(products, chars)
+    tokens = count_tokens(content)
+    while tokens > token_budget and chars > 0:
+        chars = chars // 2 if chars > 20 else 0
+        content = render(products, chars)
+        tokens = count_tokens(content)
+
+    # ...then drop items from the bottom of the ranking.
+    kept = len(products)
+    while kept > 1 and tokens > token_budget:
+        kept -= 1
+        content = render(products[:kept], chars)
+        tokens = count_tokens(content)
+
+    stats = PayloadStats(
+        tokens_before=tokens_before,
+        tokens_after=tokens,
+        items_before=len(products),
+        items_after=kept,
+    )
+    return content, stats
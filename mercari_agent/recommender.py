@@ -4,15 +4,52 @@ from __future__ import annotations
 
 Provides:
 - MercapiClient: Async wrapper for mercapi library
+- SingleFlight: Coalesces concurrent identical Mercari calls
 - RecommendationService: Two-stage ranking (shallow → deep)
 - Token synonyms and core token matching"""
 
 import asyncio
-from typing import Any, Iterable, List, Optional
-
-from .config import MAX_SHALLOW, MAX_CANDIDATES, MAX_RETURN, MIN_SELLER_RATING
+import dataclasses
+import heapq
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .config import (
+    BM25_DETAIL_WEIGHT,
+    ENRICH_DEADLINE_S,
+    MAX_CANDIDATES,
+    MAX_RETURN,
+    MAX_SELLER_RATING,
+    MAX_SHALLOW,
+    MIN_SELLER_RATING,
+    RELEVANCE_MODE,
+    SCORING_ENGINE,
+    SEARCH_PAGE_BUDGET,
+    SEARCH_PAGE_CONCURRENCY,
+)
+from . import metrics, tracing
+from .bm25 import Bm25Index, Bm25Query, IdfCache
+from .limiter import AdaptiveLimiter
 from .models import ProductShallow, ProductFull, SearchRequest
-from .utils import tokenize
+from .matcher import TokenMatcher
+from .ngram import NgramIndex
+from .scoring import VectorScorer, np
+from .tokenizer import normalize
+from .utils import search_request_key, tokenize
+
+if TYPE_CHECKING:
+    from .cache import ItemCache
 
 try:
     from mercapi import Mercapi  # type: ignore
@@ -21,10 +58,63 @@ except ImportError:
     Mercapi = None  # type: ignore
     SearchRequestData = None  # type: ignore
 
+# Deep-score bonus when the seller pays shipping.
+SHIPPING_BONUS = 0.5
+
+
+# ProductShallow field names, for copying a (slotted) shallow product into a ProductFull.
+_SHALLOW_FIELDS = tuple(f.name for f in dataclasses.fields(ProductShallow))
+
+# Predicate over raw search items; lets paginating clients stop once enough items qualify.
+IncludeFn = Callable[[Any], bool]
+
+
+class KeyedInclude:
+    """An IncludeFn plus `key`, the settings its decisions depend on.
+
+    Search caches and single-flight put `key` into their keys (see
+    shared_search_key), so searches paginated under different filters, e.g.
+    another max_price_jpy, never share results.
+    """
+
+    __slots__ = ("fn", "key")
+
+    def __init__(self, fn: IncludeFn, key: Hashable) -> None:
+        self.fn = fn
+        self.key = key
+
+    def __call__(self, raw_item: Any) -> bool:
+        return self.fn(raw_item)
+
+
+def shared_search_key(
+    request: SearchRequest, limit: int, include: Optional[IncludeFn]
+) -> Optional[Hashable]:
+    """Key under which identical searches may share results, or None if this one can't.
+
+    A plain callable `include` can't be told apart from other filters, so its
+    searches aren't shared.
+    """
+    if include is None:
+        return search_request_key(request, limit), None
+    if isinstance(include, KeyedInclude):
+        return search_request_key(request, limit), include.key
+    return None
+
+# Mercari page tokens are sequential ("v1:1", "v1:2", ...), so later pages can be requested in parallel.
+_PAGE_TOKEN_RE = re.compile(r"^v1:(\d+)$")
+
+
 class AbstractMercariClient:
     """Interface for Mercari clients."""
-    async def search(self, request: SearchRequest, limit: int = 120) -> Iterable[Any]:
-        #Return raw search results for a structured request
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        #Return raw search results for a structured request.
+        #`include` only decides how many results are worth fetching; it never filters them.
         raise NotImplementedError
 
     async def enrich_item(self, raw_item: Any) -> Any:
@@ -32,15 +122,106 @@ class AbstractMercariClient:
         raise NotImplementedError
 
 
-class MercapiClient(AbstractMercariClient):
-    """Async adapter for mercapi.Mercapi."""
+class _Flight:
+    """One in-flight call and how many callers are waiting on it."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+
+class SingleFlight:
+    """Share one in-flight task between concurrent calls with the same key.
+
+    Every caller awaits the same task through asyncio.shield, so results and
+    exceptions reach all of them, and one caller being cancelled doesn't
+    cancel the others. The underlying call is only cancelled once every
+    waiting caller has gone away.
+    """
 
     def __init__(self) -> None:
+        self.coalesced = 0  # calls that joined an existing flight instead of starting one
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done() or flight.abandoned:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t, key=key, flight=flight: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller was cancelled; stop the shared work too.
+                flight.abandoned = True
+                flight.task.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class MercapiClient(AbstractMercariClient):
+    """Async adapter for mercapi.Mercapi.
+
+    All network calls go through one AdaptiveLimiter, so sharing the client
+    shares the concurrency budget towards Mercari. Concurrent identical
+    searches and enrichments of the same item are coalesced via SingleFlight.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        page_budget: int = SEARCH_PAGE_BUDGET,
+        page_concurrency: int = SEARCH_PAGE_CONCURRENCY,
+    ) -> None:
         if Mercapi is None or SearchRequestData is None:
             raise RuntimeError("mercapi is not installed")
         self._client = Mercapi()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.flights = SingleFlight()
+        self.page_budget = max(1, page_budget)
+        self.page_concurrency = max(1, page_concurrency)
+
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        key = shared_search_key(request, limit, include)
+        if key is None:
+            return await self._search(request, limit, include)
+        return await self.flights.do(("search", key), lambda: self._search(request, limit, include))
 
-    async def search(self, request: SearchRequest, limit: int = 120) -> Iterable[Any]:
+    async def enrich_item(self, raw_item: Any) -> Any:
+        item_id = getattr(raw_item, "id_", None)
+        if not item_id:
+            return await self._enrich(raw_item)
+        return await self.flights.do(("item", item_id), lambda: self._enrich(raw_item))
+
+    async def _search(
+        self,
+        request: SearchRequest,
+        limit: int,
+        include: Optional[IncludeFn] = None,
+    ) -> List[Any]:
+        """Fetch result pages until `limit` items pass `include` (all count if None).
+
+        At most `page_budget` pages are fetched per request. When the page
+        token is sequential, follow-up pages are requested
+        `page_concurrency` at a time instead of one by one.
+        """
         # Map SearchRequest to mercapi search params
         query = request.query_text
         #print("Search query:", query)
@@ -57,22 +238,72 @@ class MercapiClient(AbstractMercariClient):
         elif request.shipping_preference == "buyer_pays":
             shipping_payer = [1]
 
-        results = await self._client.search(
-            query,
-            price_min=price_min,
-            price_max=price_max,
-            #item_conditions=item_conditions,
-            shipping_payer=shipping_payer,
-            # Only search for items that are currently on sale
-            status=[SearchRequestData.Status.STATUS_ON_SALE],
-        )
-        return results.items[:limit]
+        async def fetch_page(page_token: Optional[str], guessed: bool = False) -> Any:
+            # A guessed page may lie past the end of the results; its failure
+            # is not an upstream error and must not shrink the shared limit.
+            async with self.limiter.slot(count_errors=not guessed):
+                return await self._client.search(
+                    query,
+                    price_min=price_min,
+                    price_max=price_max,
+                    #item_conditions=item_conditions,
+                    shipping_payer=shipping_payer,
+                    # Only search for items that are currently on sale
+                    status=[SearchRequestData.Status.STATUS_ON_SALE],
+                    page_token=page_token,
+                )
+
+        items: List[Any] = []
+        accepted = 0
+
+        def collect(page_items: List[Any]) -> bool:
+            """Add a page's items; True once `limit` accepted items have been seen."""
+            nonlocal accepted
+            for item in page_items:
+                items.append(item)
+                if include is None or include(item):
+                    accepted += 1
+                    if accepted >= limit:
+                        return True
+            return False
 
-    async def enrich_item(self, raw_item: Any) -> Any:
+        results = await fetch_page(None)
+        pages = 1
+        if collect(results.items):
+            return items
+
+        next_token = results.meta.next_page_token
+        while next_token and results.items and pages < self.page_budget:
+            match = _PAGE_TOKEN_RE.match(next_token)
+            if match:
+                first = int(match.group(1))
+                batch = min(self.page_concurrency, self.page_budget - pages)
+                batch_results = await asyncio.gather(
+                    *[fetch_page(f"v1:{first + i}", guessed=i > 0) for i in range(batch)],
+                    return_exceptions=True,
+                )
+            else:
+                batch_results = [await fetch_page(next_token)]
+            for i, results in enumerate(batch_results):
+                if isinstance(results, BaseException):
+                    if i == 0:
+                        raise results  # the token Mercari gave us failed
+                    return items  # a guessed page past the end; keep what we have
+                pages += 1
+                if collect(results.items):
+                    return items
+                if not results.items:
+                    break
+            next_token = results.meta.next_page_token
+        return items
+
+    async def _enrich(self, raw_item: Any) -> Any:
         try:
-            return await raw_item.full_item()
+            async with self.limiter.slot():
+                return await raw_item.full_item()
         except Exception as e:
             #print(f"Failed to enrich item {getattr(raw_item, 'id_', 'unknown')}: {e}")
+            metrics.inc("mercari_enrich_failures_total")
             return None
 
 
@@ -87,6 +318,12 @@ class RecommendationService:
         max_return: int = MAX_RETURN,
         min_seller_rating: float = MIN_SELLER_RATING,
         max_price_jpy: Optional[int] = None,
+        item_cache: Optional[ItemCache] = None,
+        enrich_deadline_s: Optional[float] = ENRICH_DEADLINE_S,
+        early_stop: bool = True,
+        scoring_engine: str = SCORING_ENGINE,
+        relevance_mode: str = RELEVANCE_MODE,
+        idf_cache: Optional[IdfCache] = None,
     ) -> None:
         self.client = client
         self.max_shallow = max_shallow
@@ -94,7 +331,34 @@ class RecommendationService:
         self.max_return = max_return
         self.min_seller_rating = min_seller_rating
         self.max_price_jpy = max_price_jpy
+        # Shared across turns/services so overlapping queries skip re-enrichment.
+        self.item_cache = item_cache
+        # Stop waiting on enrichment after this many seconds (None waits for all).
+        self.enrich_deadline_s = enrich_deadline_s
+        # Cancel outstanding enrichments once the top `max_return` can no longer change.
+        self.early_stop = early_stop
+        # "python" scores item by item; "numpy" scores whole batches (see scoring.VectorScorer).
+        if scoring_engine not in ("python", "numpy"):
+            raise ValueError(f"Unknown scoring engine: {scoring_engine}")
+        self.scoring_engine = scoring_engine
+        # "tokens" counts query-token substring hits; "ngram" uses character
+        # n-gram Dice overlap (see ngram.NgramIndex); "bm25" scores names with
+        # BM25 and adds description/category BM25 after enrichment (see bm25).
+        if relevance_mode not in ("tokens", "ngram", "bm25"):
+            raise ValueError(f"Unknown relevance mode: {relevance_mode}")
+        self.relevance_mode = relevance_mode
+        # "bm25" name statistics by search keywords; pass one in to keep them across calls.
+        self.idf_cache = idf_cache or IdfCache()
+        # Relevance by item ID from an index over the pool (non-"tokens" modes).
+        self._index_relevance: Dict[str, float] = {}
+        self._query_text = ""
+        # "bm25" mode: description/category relevance, set up per recommend() call.
+        self._detail_query: Optional[Bm25Query] = None
+        self._detail_relevance: Dict[str, float] = {}
         self._current_tokens: List[str] = []
+        self._matcher = TokenMatcher([])
+        # (relevance, price_score) by item ID; both are fixed for one recommend() call.
+        self._parts: Dict[str, Tuple[float, float]] = {}
     
     async def recommend(
         self,
@@ -106,60 +370,214 @@ class RecommendationService:
             return []
 
         # Run all searches in parallel.
-        search_tasks = [
-            self.client.search(req, limit=self.max_shallow)
-            for req in search_requests
-        ]
+        search_tasks = [self._search(req) for req in search_requests]
         per_request_results = await asyncio.gather(
             *search_tasks,
             return_exceptions=False,
         )
 
         # Pool and deduplicate raw items across all candidates.
-        raw_items: List[Any] = []
-        seen_ids: set[str] = set()
-        for items in per_request_results:
-            for item in items:
-                item_id = getattr(item, "id_", None)
-                if not item_id or item_id in seen_ids:
-                    continue
-                seen_ids.add(item_id)
-                raw_items.append(item)
+        with tracing.span("pool") as sp:
+            raw_items: List[Any] = []
+            seen_ids: set[str] = set()
+            for items in per_request_results:
+                for item in items:
+                    item_id = getattr(item, "id_", None)
+                    if not item_id or item_id in seen_ids:
+                        continue
+                    seen_ids.add(item_id)
+                    raw_items.append(item)
+            sp.set(items_in=sum(len(items) for items in per_request_results), items_out=len(raw_items))
 
         # Build relevance tokens from the user query + all candidate query texts.
         combined_query_text = " ".join(req.query_text for req in search_requests)                
-        self._current_tokens = tokenize(f"{user_query} {combined_query_text}")
+        query_text = f"{user_query} {combined_query_text}"
+        self._set_tokens(tokenize(query_text))
+        self._query_text = query_text
         #print("Raw results: ", len(raw_items))
 
         # Parse shallow items, filter, and score.
-        shallow_items = [self._parse_shallow(item) for item in raw_items]
-        filtered = [p for p in shallow_items if self._should_include(p)]
-        scored = sorted(filtered, key=self._shallow_score, reverse=True)
-        candidates = scored[:self.max_candidates]
+        with tracing.span("shallow_score") as sp:
+            shallow_items = [self._parse_shallow(item) for item in raw_items]
+            filtered = [p for p in shallow_items if self._should_include(p)]
+            if self.relevance_mode == "ngram":
+                scores = NgramIndex([p.name for p in filtered]).dice_scores(query_text)
+                self._index_relevance = {p.id: score for p, score in zip(filtered, scores)}
+            elif self.relevance_mode == "bm25":
+                # Names share IDF statistics with earlier pools for the same keywords.
+                keywords = tuple(sorted({normalize(req.query_text) for req in search_requests}))
+                idf_table = self.idf_cache.table(keywords)
+                index = Bm25Index([p.id for p in filtered], [p.name for p in filtered], idf_table)
+                # Details are scored with the same IDFs, fixed for this call, so an
+                # item's detail relevance doesn't depend on which others got enriched.
+                self._detail_query = Bm25Query(query_text, idf_table)
+                # Enrichment can add up to BM25_DETAIL_WEIGHT (see _detail_score).
+                name_weight = 1.0 - BM25_DETAIL_WEIGHT
+                self._index_relevance = {
+                    p.id: name_weight * score for p, score in zip(filtered, index.scores(query_text))
+                }
+            # Scores are computed once per item and the top K selected without a full sort.
+            if self.scoring_engine == "numpy":
+                scorer = self._vector_scorer()
+                if self.relevance_mode == "tokens":
+                    parts = scorer.parts(filtered)
+                else:
+                    relevance = np.array([self._index_relevance[p.id] for p in filtered], dtype=float)
+                    parts = (relevance, scorer.price_scores(filtered))
+                for p, relevance, price_score in zip(filtered, *(col.tolist() for col in parts)):
+                    self._parts[p.id] = (relevance, price_score)
+                top = scorer.rank(scorer.shallow_scores(filtered, parts), self.max_candidates)
+            else:
+                shallow_scores = [self._shallow_score(p) for p in filtered]
+                top = heapq.nlargest(
+                    self.max_candidates, range(len(filtered)), key=shallow_scores.__getitem__
+                )
+            candidates = [filtered[i] for i in top]
+            sp.set(items_in=len(shallow_items), filtered=len(filtered), items_out=len(candidates))
         #print("Candidate total: ", len(candidates))
 
         raw_by_id = {it.id_: it for it in raw_items}
 
-        # Enrich top candidates concurrently.
-        enriched_raw = await asyncio.gather(
-            *[
-                self.client.enrich_item(raw_by_id[p.id])
-                for p in candidates
-                if p.id in raw_by_id
-            ],
-            return_exceptions=False,
-        )
+        # Enrich candidates (cache first, then streamed fetches with early stop).
+        with tracing.span("enrich", items_in=len(candidates)) as sp:
+            fields_by_id = await self._enrich(candidates, raw_by_id)
+            sp.set(items_out=len(fields_by_id))
 
-        # Merge shallow + enriched data.
+        # Merge shallow + enriched data, keeping shallow-rank order.
         enriched: List[ProductFull] = []
-        for raw, shallow in zip(enriched_raw, candidates):
-            if raw is None:
-                continue  # skip items that failed to enrich
-            enriched.append(self._merge_full(raw, shallow))
+        for shallow in candidates:
+            fields = fields_by_id.get(shallow.id)
+            if fields is not None:
+                enriched.append(self._merge_full(fields, shallow))
 
         # Final deep ranking
-        ranked = sorted(enriched, key=self._deep_score, reverse=True)
-        return ranked[:self.max_return]
+        with tracing.span("deep_rank", items_in=len(enriched)) as sp:
+            ranked = self._deep_rank(enriched)
+            sp.set(items_out=len(ranked))
+        return ranked
+
+    async def _search(self, req: SearchRequest) -> List[Any]:
+        with tracing.span("search", query=req.query_text) as sp:
+            # Keyed on the settings _should_include reads, so cached pools match them.
+            include = KeyedInclude(self._include_raw, (self.max_price_jpy or None, self.min_seller_rating))
+            items = await self.client.search(req, limit=self.max_shallow, include=include)
+            sp.set(items=len(items))
+        return items
+
+    def _deep_rank(self, enriched: List[ProductFull]) -> List[ProductFull]:
+        if self.scoring_engine == "numpy":
+            if not enriched:
+                return []
+            scorer = self._vector_scorer()
+            relevance, price_scores = zip(*(self._score_parts(p) for p in enriched))
+            detail = np.array([self._detail_score(p) for p in enriched])
+            parts = (np.array(relevance) + BM25_DETAIL_WEIGHT * detail, np.array(price_scores))
+            return [enriched[i] for i in scorer.rank(scorer.deep_scores(enriched, parts), self.max_return)]
+        return heapq.nlargest(self.max_return, enriched, key=self._deep_score)
+
+    def _detail_score(self, p: ProductFull) -> float:
+        """Description/category BM25 of an enriched item ("bm25" mode only, else 0)."""
+        if self._detail_query is None:
+            return 0.0
+        score = self._detail_relevance.get(p.id)
+        if score is None:
+            score = self._detail_query.score(f"{p.category or ''} {p.description or ''}")
+            self._detail_relevance[p.id] = score
+        return score
+
+    def _set_tokens(self, tokens: List[str]) -> None:
+        """Set the relevance tokens and compile them into a matcher once per call."""
+        self._current_tokens = tokens
+        self._matcher = TokenMatcher(tokens)
+        self._parts = {}
+        self._index_relevance = {}
+        self._detail_query = None
+        self._detail_relevance = {}
+
+    def _vector_scorer(self) -> VectorScorer:
+        return VectorScorer(self._current_tokens, self.max_price_jpy, SHIPPING_BONUS)
+
+    async def _enrich(
+        self,
+        candidates: List[ProductShallow],
+        raw_by_id: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return enrichment fields by item ID for as many candidates as needed.
+
+        Cached items are used directly. The rest are fetched concurrently and
+        consumed as they complete; once `max_return` items are enriched and no
+        pending item's deep-score upper bound can beat the current K-th best,
+        the remaining fetches are cancelled. If `enrich_deadline_s` is set, the
+        best set available when it expires is returned. Items that fail to
+        enrich are skipped.
+        """
+        fields_by_id: Dict[str, Dict[str, Any]] = {}
+        if self.item_cache is not None:
+            fields_by_id = await self.item_cache.get_many(p.id for p in candidates)
+        to_fetch = [p for p in candidates if p.id not in fields_by_id and p.id in raw_by_id]
+        if not to_fetch:
+            return fields_by_id
+
+        # Min-heap of the best `max_return` deep scores seen so far.
+        top_scores: List[float] = []
+
+        def push_score(fields: Dict[str, Any], shallow: ProductShallow) -> None:
+            heapq.heappush(top_scores, self._deep_score(self._merge_full(fields, shallow)))
+            if len(top_scores) > self.max_return:
+                heapq.heappop(top_scores)
+
+        for p in candidates:
+            if p.id in fields_by_id:
+                push_score(fields_by_id[p.id], p)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.enrich_deadline_s if self.enrich_deadline_s is not None else None
+        pending: Dict[asyncio.Task, ProductShallow] = {
+            asyncio.ensure_future(self._enrich_one(raw_by_id[p.id])): p for p in to_fetch
+        }
+        # Candidates are in shallow-score order, so the first still-pending one
+        # has the highest upper bound; `head` only moves forward.
+        order = list(to_fetch)
+        head = 0
+        fetched_fields: Dict[str, Dict[str, Any]] = {}
+        try:
+            while pending:
+                if self.early_stop and len(top_scores) >= self.max_return:
+                    pending_ids = {p.id for p in pending.values()}
+                    while order[head].id not in pending_ids:
+                        head += 1
+                    if self._deep_upper_bound(order[head]) < top_scores[0]:
+                        break
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break  # deadline reached
+                for task in done:
+                    shallow = pending.pop(task)
+                    raw = task.result()
+                    if raw is None:
+                        continue  # skip items that failed to enrich
+                    fields = self._full_fields(raw)
+                    fetched_fields[shallow.id] = fields
+                    push_score(fields, shallow)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if self.item_cache is not None:
+            await self.item_cache.put_many(fetched_fields)
+        fields_by_id.update(fetched_fields)
+        return fields_by_id
+
+    async def _enrich_one(self, raw_item: Any) -> Any:
+        with tracing.span("enrich_item", item_id=raw_item.id_) as sp:
+            raw = await self.client.enrich_item(raw_item)
+            sp.set(ok=raw is not None)
+        return raw
 
     def _parse_shallow(self, raw_item: Any) -> ProductShallow:
         """Convert raw search result to ProductShallow."""
@@ -178,6 +596,10 @@ class RecommendationService:
             created_at=raw_item.created.isoformat() if raw_item.created else None,
         )
 
+    def _include_raw(self, raw_item: Any) -> bool:
+        """_should_include for a raw search item (used to stop paginating early)."""
+        return self._should_include(self._parse_shallow(raw_item))
+
     # Basic filters
     def _should_include(self, p: ProductShallow) -> bool:
         """Check if product passes filters."""
@@ -199,19 +621,33 @@ class RecommendationService:
 
     def _shallow_score(self, p: ProductShallow) -> float:
         """Score using price proximity, relevance, rating, and sales count."""
-        relevance = self._relevance_score(p)
+        relevance, price_score = self._score_parts(p)
         rating = p.seller_rating or 0.0
-        price_score = self._price_score(p)
         #sales_bonus = min((p.seller_sales_count or 0) / 1000.0, 1.0) * 0.5
         return relevance * 4.0 + rating * 1.2 + (price_score * 1.3) #+ sales_bonus
 
+    def _score_parts(self, p: ProductShallow) -> Tuple[float, float]:
+        """Relevance and price score for `p`, computed once per recommend() call.
+
+        Enrichment only fills in the rating and shipping terms, so deep
+        scoring reuses these instead of re-running the token scan.
+        """
+        parts = self._parts.get(p.id)
+        if parts is None:
+            parts = (self._relevance_score(p), self._price_score(p))
+            self._parts[p.id] = parts
+        return parts
+
     def _relevance_score(self, p: ProductShallow) -> float:
         """Measure how well the item name matches the current token set."""
+        if self.relevance_mode != "tokens":
+            return self._index_relevance.get(p.id, 0.0)
         if not self._current_tokens:
             return 0.0
-        name = (p.name or "").lower()
-        # Count token hits in the name
-        hits = sum(1 for t in self._current_tokens if t and t in name)
+        # Same normalization as the query tokens (width, case, katakana/hiragana).
+        name = normalize(p.name or "")
+        # Count token hits in the name (one automaton pass over the name)
+        hits = self._matcher.count_hits(name)
         return hits / max(len(self._current_tokens), 1)
     
     def _price_score(self, p: ProductShallow) -> float:
@@ -223,23 +659,28 @@ class RecommendationService:
         diff = abs(p.price_jpy - target)
         return max(0.0, 1.0 - diff / target)
 
-    def _merge_full(self, raw: Any, shallow: ProductShallow) -> ProductFull:
-        """Combine shallow and enriched data."""
+    def _full_fields(self, raw: Any) -> Dict[str, Any]:
+        """Extract the enrichment-only fields from a full item.
+
+        The result is JSON-safe so it can be cached (see ItemCache) and
+        merged onto a fresh ProductShallow later.
+        """
+        fields: Dict[str, Any] = {}
         if raw.seller:
-            shallow.seller_rating = float(raw.seller.star_rating_score)
-            shallow.seller_sales_count = int(raw.seller.num_sell_items)
-        
+            fields["seller_rating"] = float(raw.seller.star_rating_score)
+            fields["seller_sales_count"] = int(raw.seller.num_sell_items)
+
         if raw.item_condition:
-            shallow.condition_label = raw.item_condition.name
+            fields["condition_label"] = raw.item_condition.name
 
         if raw.created:
-            shallow.created_at = raw.created.isoformat()
+            fields["created_at"] = raw.created.isoformat()
 
         # Shipping details
         shipping_fee_included = False
         if raw.shipping_payer and raw.shipping_payer.code:
             shipping_fee_included = raw.shipping_payer.code == "seller"
-    
+
         shipping_days_min: Optional[int] = None
         shipping_days_max: Optional[int] = None
         if raw.shipping_duration:
@@ -251,8 +692,7 @@ class RecommendationService:
         if raw.item_category:
             category = raw.item_category.name
 
-        return ProductFull(
-            **shallow.__dict__,
+        fields.update(
             description=raw.description,
             category=category,
             attributes=None,
@@ -260,10 +700,29 @@ class RecommendationService:
             shipping_days_min=shipping_days_min,
             shipping_days_max=shipping_days_max,
         )
+        return fields
+
+    def _merge_full(self, fields: Dict[str, Any], shallow: ProductShallow) -> ProductFull:
+        """Combine shallow and enriched data."""
+        data = {name: getattr(shallow, name) for name in _SHALLOW_FIELDS}
+        data.update(fields)
+        return ProductFull(**data)
 
     def _deep_score(self, p: ProductFull) -> float:
-        """Add shipping bonus to shallow score."""
-        base = self._shallow_score(p)
+        """Add shipping bonus and, in "bm25" mode, detail relevance to shallow score."""
+        base = self._shallow_score(p) + BM25_DETAIL_WEIGHT * self._detail_score(p) * 4.0
         # Bonus for free shipping
-        shipping_bonus = 0.5 if p.shipping_fee_included else 0.0
+        shipping_bonus = SHIPPING_BONUS if p.shipping_fee_included else 0.0
         return base + shipping_bonus
+
+    def _deep_upper_bound(self, p: ProductShallow) -> float:
+        """Highest deep score `p` could reach once enriched.
+
+        Enrichment can only add the seller rating term (rating is unknown at
+        the shallow stage), the shipping bonus and, in "bm25" mode, up to
+        BM25_DETAIL_WEIGHT of description relevance; price doesn't change.
+        """
+        relevance, price_score = self._score_parts(p)
+        if self.relevance_mode == "bm25":
+            relevance += BM25_DETAIL_WEIGHT
+        return relevance * 4.0 + MAX_SELLER_RATING * 1.2 + price_score * 1.3 + SHIPPING_BONUS
@@ -0,0 +1,100 @@
+"""Templated reply renderer ("fast render" mode).
+
+Fills the presentation prompt's "1. Product Name / Price / URL / Reason"
+format directly from ProductFull fields, so a search turn needs no
+presentation LLM call. Reasons are built from price vs budget, seller
+rating and sales, shipping and condition.
+"""
+
+from typing import List, Optional, Sequence
+
+from .models import ProductFull
+from .utils import product_url
+
+TOP_N = 3
+
+
+def _reason(p: ProductFull, max_price_jpy: Optional[int]) -> str:
+    parts: List[str] = []
+    if max_price_jpy:
+        if p.price_jpy <= max_price_jpy:
+            saved = max_price_jpy - p.price_jpy
+            pct = round(100 * saved / max_price_jpy)
+            parts.append(
+                f"{pct}% under your {max_price_jpy:,} JPY budget" if pct >= 5 else "within your budget"
+            )
+        else:
+            parts.append(f"slightly over your {max_price_jpy:,} JPY budget")
+    if p.seller_rating is not None:
+        rating = f"seller rated {p.seller_rating:g}/5"
+        if p.seller_sales_count:
+            rating += f" across {p.seller_sales_count:,} listings"
+        parts.append(rating)
+    if p.shipping_fee_included:
+        parts.append("seller pays shipping")
+    elif p.shipping_fee_included is False:
+        parts.append("buyer pays shipping")
+    if p.shipping_days_min is not None and p.shipping_days_max is not None:
+        parts.append(f"ships in {p.shipping_days_min}-{p.shipping_days_max} days")
+    if p.condition_label:
+        parts.append(f"condition: {p.condition_label}")
+    if not parts:
+        return "Closest match to your search."
+    reason = "; ".join(parts)
+    return reason[0].upper() + reason[1:] + "."
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def _follow_up(keywords: Sequence[str], max_price_jpy: Optional[int]) -> str:
+    """Suggest a next step that differs from every keyword already searched.
+
+    Tries a broader keyword (a searched keyword with trailing modifiers
+    dropped, English keywords first), then a higher budget, then a generic
+    prompt.
+    """
+    searched = {_normalize_keyword(kw) for kw in keywords}
+    for kw in sorted(keywords, key=lambda kw: not kw.isascii()):
+        words = kw.split()
+        for n in range(len(words) - 1, 0, -1):
+            broader = " ".join(words[:n])
+            if _normalize_keyword(broader) not in searched:
+                return f'Would you like me to try a broader search for "{broader}"?'
+    if max_price_jpy:
+        # 1.5x the budget, rounded up to the next 100 JPY.
+        raised = -(-max_price_jpy * 3 // 200) * 100
+        return f"Would you like me to search again with a higher budget, e.g. up to {raised:,} JPY?"
+    return "Would you like to try different keywords or a higher budget?"
+
+
+def render_recommendations(
+    products: Sequence[ProductFull],
+    max_price_jpy: Optional[int] = None,
+    keywords: Sequence[str] = (),
+) -> str:
+    """Render the top recommendations in the presentation prompt's format.
+
+    `products` must already be ranked. With fewer than TOP_N items, a
+    follow-up search is suggested, as the presentation prompt asks; it is
+    never one of the `keywords` that were just searched.
+    """
+    lines: List[str] = []
+    for i, p in enumerate(products[:TOP_N], start=1):
+        lines.extend(
+            [
+                f"{i}. {p.name}",
+                f"   - Price: {p.price_jpy:,} JPY",
+                f"   - URL: {product_url(p) or 'N/A'}",
+                f"   - Reason: {_reason(p, max_price_jpy)}",
+                "",
+            ]
+        )
+
+    if len(products) < TOP_N:
+        found = "I couldn't find any matching items" if not products else (
+            f"I only found {len(products)} matching item{'s' if len(products) > 1 else ''}"
+        )
+        lines.append(f"{found}. {_follow_up(keywords, max_price_jpy)}")
+    return "\n".join(lines).strip()
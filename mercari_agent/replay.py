@@ -0,0 +1,302 @@
+"""Record/replay of Mercari and OpenAI traffic.
+
+Recording wraps the real clients and appends every response to a gzip'd
+JSON-lines file: Mercari search results and item details (only the fields
+RecommendationService reads), chat completions, and streamed completions
+chunk by chunk, each with its measured latency. Replay clients serve those
+responses back, sleeping for the recorded latency times `time_scale`
+(1.0 = original timing, 0 = as fast as possible), so a whole conversation
+can be re-run offline:
+
+    agent = MercariChatAgent(
+        mercari_client=ReplayMercariClient("session.jsonl.gz"),
+        openai_client=ReplayOpenAI("session.jsonl.gz"),
+    )
+
+Responses are matched by request, not by position: searches by
+search_request_key, item details by item ID, and completions by step
+(analyst/presentation), streaming flag and the latest user message. Each
+key's responses are served in recorded order; the last one repeats once
+they run out.
+"""
+
+import asyncio
+import datetime
+import gzip
+import json
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from .fake import FakeItem, FakeNamed, FakeSearchItem, FakeSeller, FakeShippingDuration, FakeShippingPayer
+from .models import SearchRequest
+from .recommender import AbstractMercariClient, IncludeFn
+from .utils import search_request_key
+
+
+class Recorder:
+    """Appends events to a gzip'd JSON-lines recording."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    def record(self, kind: str, key: Any, response: Any, duration_s: float = 0.0, **extra: Any) -> None:
+        event = {"k": kind, "key": key, "d": round(duration_s, 4), "r": response, **extra}
+        self._file.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """All events of a recording, in order."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _Responses:
+    """Recorded events grouped by (kind, key), served in order."""
+
+    def __init__(self, events: Iterable[Dict[str, Any]], kinds: Iterable[str]) -> None:
+        kinds = set(kinds)
+        self._queues: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        for event in events:
+            if event["k"] in kinds:
+                self._queues[self._id(event["k"], event["key"])].append(event)
+        self.misses = 0
+
+    @staticmethod
+    def _id(kind: str, key: Any) -> str:
+        return json.dumps([kind, key], ensure_ascii=False)
+
+    def next(self, kind: str, key: Any) -> Optional[Dict[str, Any]]:
+        ident = self._id(kind, key)
+        queue = self._queues.get(ident)
+        if not queue:
+            self.misses += 1
+            return None
+        index = min(self._served[ident], len(queue) - 1)
+        self._served[ident] += 1
+        return queue[index]
+
+
+async def _sleep(duration_s: float, time_scale: float) -> None:
+    if duration_s > 0 and time_scale > 0:
+        await asyncio.sleep(duration_s * time_scale)
+
+
+# Mercari ---------------------------------------------------------------
+
+
+def _iso(value: Optional[datetime.datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _search_item_to_dict(item: Any) -> Dict[str, Any]:
+    return {
+        "id": item.id_,
+        "name": item.name,
+        "price": item.price,
+        "type": item.item_type,
+        "created": _iso(item.created),
+    }
+
+
+def _full_item_to_dict(raw: Any) -> Dict[str, Any]:
+    seller = raw.seller
+    duration = raw.shipping_duration
+    return {
+        "id": raw.id_,
+        "name": raw.name,
+        "price": raw.price,
+        "created": _iso(raw.created),
+        "seller": [seller.star_rating_score, seller.num_sell_items] if seller else None,
+        "condition": raw.item_condition.name if raw.item_condition else None,
+        "category": raw.item_category.name if raw.item_category else None,
+        "payer": raw.shipping_payer.code if raw.shipping_payer else None,
+        "days": [duration.min_days, duration.max_days] if duration else None,
+        "description": raw.description,
+    }
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+def _search_item_from_dict(data: Dict[str, Any]) -> FakeSearchItem:
+    return FakeSearchItem(
+        id_=data["id"],
+        name=data["name"],
+        price=data["price"],
+        created=_parse_time(data["created"]),
+        item_type=data["type"],
+    )
+
+
+def _full_item_from_dict(data: Dict[str, Any]) -> FakeItem:
+    return FakeItem(
+        id_=data["id"],
+        name=data["name"],
+        price=data["price"],
+        created=_parse_time(data["created"]),
+        seller=FakeSeller(*data["seller"]) if data["seller"] else None,
+        item_condition=FakeNamed(data["condition"]) if data["condition"] else None,
+        item_category=FakeNamed(data["category"]) if data["category"] else None,
+        shipping_payer=FakeShippingPayer(data["payer"]) if data["payer"] else None,
+        shipping_duration=FakeShippingDuration(*data["days"]) if data["days"] else None,
+        description=data["description"],
+    )
+
+
+class RecordingMercariClient(AbstractMercariClient):
+    """Passes calls through to `inner` and records each response."""
+
+    def __init__(self, inner: AbstractMercariClient, recorder: Recorder) -> None:
+        self.inner = inner
+        self.recorder = recorder
+
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        start = time.perf_counter()
+        items = list(await self.inner.search(request, limit=limit, include=include))
+        self.recorder.record(
+            "search",
+            list(search_request_key(request, limit)),
+            [_search_item_to_dict(item) for item in items],
+            time.perf_counter() - start,
+        )
+        return items
+
+    async def enrich_item(self, raw_item: Any) -> Any:
+        start = time.perf_counter()
+        raw = await self.inner.enrich_item(raw_item)
+        self.recorder.record(
+            "item",
+            raw_item.id_,
+            _full_item_to_dict(raw) if raw is not None else None,
+            time.perf_counter() - start,
+        )
+        return raw
+
+
+class ReplayMercariClient(AbstractMercariClient):
+    """Serves recorded Mercari responses. Unrecorded searches return no items
+    and unrecorded item details return None (counted in `misses`)."""
+
+    def __init__(self, path: str, time_scale: float = 1.0) -> None:
+        self.time_scale = time_scale
+        self._responses = _Responses(load_events(path), ("search", "item"))
+
+    @property
+    def misses(self) -> int:
+        return self._responses.misses
+
+    async def search(
+        self,
+        request: SearchRequest,
+        limit: int = 120,
+        include: Optional[IncludeFn] = None,
+    ) -> Iterable[Any]:
+        event = self._responses.next("search", list(search_request_key(request, limit)))
+        if event is None:
+            return []
+        await _sleep(event["d"], self.time_scale)
+        return [_search_item_from_dict(item) for item in event["r"]]
+
+    async def enrich_item(self, raw_item: Any) -> Any:
+        event = self._responses.next("item", raw_item.id_)
+        if event is None:
+            return None
+        await _sleep(event["d"], self.time_scale)
+        return _full_item_from_dict(event["r"]) if event["r"] is not None else None
+
+
+# OpenAI ----------------------------------------------------------------
+
+
+def completion_key(kwargs: Dict[str, Any]) -> List[Any]:
+    """Replay key for a chat.completions.create call."""
+    step = "analyst" if kwargs.get("tools") else "presentation"
+    last_user = next(
+        (m.get("content") for m in reversed(kwargs.get("messages") or []) if m.get("role") == "user"),
+        None,
+    )
+    return [step, bool(kwargs.get("stream")), last_user]
+
+
+class RecordingOpenAI:
+    """Exposes chat.completions.create over `inner` (an AsyncOpenAI) and records every response."""
+
+    def __init__(self, inner: Any, recorder: Recorder) -> None:
+        self.inner = inner
+        self.recorder = recorder
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs: Any) -> Any:
+        key = completion_key(kwargs)
+        start = time.perf_counter()
+        response = await self.inner.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(key, response, start)
+        self.recorder.record(
+            "chat", key, response.model_dump(exclude_none=True), time.perf_counter() - start
+        )
+        return response
+
+    async def _record_stream(self, key: List[Any], stream: Any, start: float) -> AsyncIterator[Any]:
+        chunks: List[Dict[str, Any]] = []
+        gaps: List[float] = []
+        last = start
+        try:
+            async for chunk in stream:
+                now = time.perf_counter()
+                gaps.append(round(now - last, 4))
+                last = now
+                chunks.append(chunk.model_dump(exclude_none=True))
+                yield chunk
+        finally:
+            # A stream the consumer abandoned is recorded as far as it got.
+            self.recorder.record("chat", key, chunks, last - start, gaps=gaps)
+
+
+class ReplayOpenAI:
+    """Stands in for AsyncOpenAI, serving recorded chat completions (streamed or not).
+
+    Raises KeyError for a call that was never recorded.
+    """
+
+    def __init__(self, path: str, time_scale: float = 1.0) -> None:
+        self.time_scale = time_scale
+        self._responses = _Responses(load_events(path), ("chat",))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs: Any) -> Any:
+        key = completion_key(kwargs)
+        event = self._responses.next("chat", key)
+        if event is None:
+            raise KeyError(f"No recorded completion for {key}")
+        if kwargs.get("stream"):
+            return self._replay_stream(event)
+        await _sleep(event["d"], self.time_scale)
+        return ChatCompletion.model_validate(event["r"])
+
+    async def _replay_stream(self, event: Dict[str, Any]) -> AsyncIterator[Any]:
+        gaps = event.get("gaps") or [0.0] * len(event["r"])
+        for gap, chunk in zip(gaps, event["r"]):
+            await _sleep(gap, self.time_scale)
+            yield ChatCompletionChunk.model_validate(chunk)
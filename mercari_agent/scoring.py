@@ -0,0 +1,116 @@
+"""Optional vectorized scoring engine (requires numpy).
+
+Packs a batch of products into columnar arrays (price, rating, shipping
+flag, token-hit matrix) and computes RecommendationService's shallow and
+deep scores in one pass. The formulas mirror the per-item Python methods
+operation by operation, so scores are bit-for-bit identical.
+
+Every method takes either a sequence of products or a ProductBatch, whose
+numeric columns are copied straight from their buffers.
+"""
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .batch import ProductBatch
+from .models import ProductFull, ProductShallow
+from .tokenizer import normalize
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None  # type: ignore
+
+Products = Union[Sequence[ProductShallow], ProductBatch]
+
+
+class VectorScorer:
+    """Batch scorer for one recommend() call (fixed tokens and budget)."""
+
+    def __init__(
+        self,
+        tokens: Sequence[str],
+        max_price_jpy: Optional[int],
+        shipping_bonus: float,
+    ) -> None:
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        self.tokens = [t for t in tokens if t]
+        self.n_tokens = len(tokens)
+        self.max_price_jpy = max_price_jpy
+        self.shipping_bonus = shipping_bonus
+
+    def token_hits(self, products: Products) -> "np.ndarray":
+        """Boolean (tokens x items) matrix: does token i occur in item j's name."""
+        raw_names = products.names if isinstance(products, ProductBatch) else [p.name for p in products]
+        names = np.array([normalize(name or "") for name in raw_names], dtype=str)
+        if not self.tokens or not len(names):
+            return np.zeros((len(self.tokens), len(names)), dtype=bool)
+        return np.stack([np.char.find(names, t) >= 0 for t in self.tokens])
+
+    def relevance(self, products: Products) -> "np.ndarray":
+        if not self.n_tokens:
+            return np.zeros(len(products))
+        hits = self.token_hits(products).sum(axis=0)
+        return hits / max(self.n_tokens, 1)
+
+    def price_scores(self, products: Products) -> "np.ndarray":
+        if not self.max_price_jpy:
+            return np.zeros(len(products))
+        if isinstance(products, ProductBatch):
+            prices = np.array(products.prices, dtype=np.int64)
+        else:
+            prices = np.fromiter((p.price_jpy for p in products), dtype=np.int64, count=len(products))
+        target = max(1.0, self.max_price_jpy * 0.7)
+        diff = np.abs(prices - target)
+        return np.maximum(0.0, 1.0 - diff / target)
+
+    def parts(self, products: Products) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Relevance and price-score columns; these don't change after enrichment."""
+        return self.relevance(products), self.price_scores(products)
+
+    def shallow_scores(
+        self,
+        products: Products,
+        parts: Optional[Tuple["np.ndarray", "np.ndarray"]] = None,
+    ) -> "np.ndarray":
+        relevance, price_scores = parts if parts is not None else self.parts(products)
+        if isinstance(products, ProductBatch):
+            # Unknown ratings are NaN in the batch and count as 0, like `rating or 0.0`.
+            ratings = np.nan_to_num(np.array(products.ratings, dtype=np.float64), nan=0.0)
+        else:
+            ratings = np.fromiter(
+                (p.seller_rating or 0.0 for p in products), dtype=np.float64, count=len(products)
+            )
+        return relevance * 4.0 + ratings * 1.2 + price_scores * 1.3
+
+    def deep_scores(
+        self,
+        products: Union[Sequence[ProductFull], ProductBatch],
+        parts: Optional[Tuple["np.ndarray", "np.ndarray"]] = None,
+    ) -> "np.ndarray":
+        if isinstance(products, ProductBatch):
+            shipping = np.array(products.shipping, dtype=np.int8) == 1
+        else:
+            shipping = np.fromiter(
+                (bool(p.shipping_fee_included) for p in products), dtype=bool, count=len(products)
+            )
+        return self.shallow_scores(products, parts) + np.where(shipping, self.shipping_bonus, 0.0)
+
+    @staticmethod
+    def rank(scores: "np.ndarray", k: int) -> List[int]:
+        """Indices of the top `k` scores, ties kept in input order (like sorted(reverse=True)).
+
+        Uses argpartition to find the K-th best score, then only sorts the
+        selected indices.
+        """
+        n = len(scores)
+        if k <= 0 or n == 0:
+            return []
+        if k >= n:
+            return np.argsort(-scores, kind="stable").tolist()
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > kth)
+        # Fill the remaining slots with tied scores, earliest first, for stable ties.
+        tied = np.flatnonzero(scores == kth)[: k - len(above)]
+        selected = np.concatenate([above, tied])
+        return selected[np.lexsort((selected, -scores[selected]))].tolist()
@@ -0,0 +1,204 @@
+"""Per-session chat agents for the HTTP server.
+
+Each session gets its own MercariChatAgent (and so its own history) plus a
+lock that serializes turns within the session (see SessionManager.turn);
+different sessions run in parallel. All agents share one Mercari client
+(search cache, limiter, single-flight), one enriched-item cache, one BM25
+IDF cache and the module-level OpenAI client, so the process keeps a single
+HTTP pool per upstream.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .agent import MercariChatAgent
+from .bm25 import IdfCache
+from .cache import CachedMercariClient, ItemCache
+from .config import SESSION_MAX, SESSION_SPILL_DIR, SESSION_TTL_S
+from .history import HistoryManager
+from .recommender import AbstractMercariClient, MercapiClient
+
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_session_id(session_id: Optional[str]) -> bool:
+    """Session IDs double as spill file names, so only allow a safe charset."""
+    return bool(session_id and _SESSION_ID_RE.match(session_id))
+
+
+class Session:
+    """One user's agent, its turn lock, and when it was last used."""
+
+    def __init__(self, session_id: str, agent: MercariChatAgent) -> None:
+        self.id = session_id
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        # Turns running or waiting on `lock`; a referenced session is never evicted.
+        self.refs = 0
+
+
+class SessionManager:
+    """Bounded LRU/TTL map of session ID -> Session.
+
+    Idle sessions expire after `ttl_s`; past `max_sessions` the least
+    recently used one is evicted. Sessions with a turn in progress or
+    waiting for the lock are never evicted. When `spill_dir` is set, an
+    evicted session's history is written there (in a worker thread) and
+    restored the next time that session ID shows up.
+    """
+
+    def __init__(
+        self,
+        mercari_client: Optional[AbstractMercariClient] = None,
+        item_cache: Optional[ItemCache] = None,
+        idf_cache: Optional[IdfCache] = None,
+        max_sessions: int = SESSION_MAX,
+        ttl_s: float = SESSION_TTL_S,
+        spill_dir: Optional[str] = SESSION_SPILL_DIR,
+    ) -> None:
+        self.mercari_client = mercari_client or CachedMercariClient(MercapiClient())
+        self.item_cache = item_cache or ItemCache()
+        self.idf_cache = idf_cache or IdfCache()
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        # Spill writes still running, by session ID (a restore waits for its own).
+        self._spills: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @asynccontextmanager
+    async def turn(self, session_id: str) -> AsyncIterator[Session]:
+        """Hold the session for one turn: get() it, take its lock, release() it afterwards."""
+        session = await self.get(session_id)
+        try:
+            async with session.lock:
+                yield session
+        finally:
+            self.release(session)
+
+    async def get(self, session_id: str) -> Session:
+        """Return the session for `session_id`, creating (or restoring) it if needed.
+
+        The caller holds a reference that keeps the session from being
+        evicted and must hand it back with release(); turn() does both.
+        """
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        restore = session is None
+        if restore:
+            agent = MercariChatAgent(
+                mercari_client=self.mercari_client, item_cache=self.item_cache, idf_cache=self.idf_cache
+            )
+            session = Session(session_id, agent)
+            self._sessions[session_id] = session
+        session.refs += 1
+        self._sessions.move_to_end(session_id)
+        session.last_used = now
+        self._evict_expired(now)
+        self._evict_over_capacity()
+        if restore:
+            try:
+                # Turns on this session queue on the lock until its history is back.
+                async with session.lock:
+                    session.agent.history = await self._load_spilled(session_id)
+            except BaseException:
+                self.release(session)
+                raise
+        return session
+
+    def release(self, session: Session) -> None:
+        """Drop a reference taken by get()."""
+        session.refs -= 1
+        session.last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """Spill every session (if spilling is enabled), forget them, and wait for the writes."""
+        for session in list(self._sessions.values()):
+            self._evict(session)
+        if self._spills:
+            await asyncio.gather(*self._spills.values())
+
+    def _evict_expired(self, now: float) -> None:
+        # Sessions are kept in last-used order, so expired ones are at the front:
+        # walk from the front and stop at the first live one (no copy of the map).
+        # Expired sessions still referenced by a turn are skipped and evicted later.
+        expired: List[Session] = []
+        for session in self._sessions.values():
+            if now - session.last_used < self.ttl_s:
+                break
+            if not session.refs:
+                expired.append(session)
+        for session in expired:
+            self._evict(session)
+
+    def _evict_over_capacity(self) -> None:
+        excess = len(self._sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        victims: List[Session] = []
+        for session in self._sessions.values():
+            if len(victims) >= excess:
+                break
+            if not session.refs:
+                victims.append(session)
+        for session in victims:
+            self._evict(session)
+
+    def _evict(self, session: Session) -> None:
+        del self._sessions[session.id]
+        path = self._spill_path(session.id)
+        if path is None or not session.agent.history:
+            return
+        # Snapshot on the event loop; only the file write runs in a thread.
+        data = session.agent.history.to_dict()
+        task = asyncio.ensure_future(asyncio.to_thread(_write_spill, path, data))
+        self._spills[session.id] = task
+        task.add_done_callback(lambda t, session_id=session.id: self._forget_spill(session_id, t))
+
+    def _forget_spill(self, session_id: str, task: asyncio.Task) -> None:
+        if self._spills.get(session_id) is task:
+            del self._spills[session_id]
+
+    def _spill_path(self, session_id: str) -> Optional[str]:
+        if not self.spill_dir or not is_valid_session_id(session_id):
+            return None
+        return os.path.join(self.spill_dir, f"{session_id}.json")
+
+    async def _load_spilled(self, session_id: str) -> HistoryManager:
+        pending = self._spills.get(session_id)
+        if pending is not None:
+            await asyncio.wait({pending})  # this session's eviction is still being written
+        path = self._spill_path(session_id)
+        if path is None:
+            return HistoryManager()
+        return HistoryManager.from_dict(await asyncio.to_thread(_read_spill, path))
+
+
+def _write_spill(path: str, data: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _read_spill(path: str) -> Optional[Dict[str, Any]]:
+    """Read and delete a spill file (None if there is none or it's unreadable)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        os.remove(path)
+    except (OSError, json.JSONDecodeError):
+        data = None
+    return data
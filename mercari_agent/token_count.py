@@ -0,0 +1,39 @@
+"""Prompt token counting.
+
+Uses tiktoken when installed, otherwise a character heuristic (about 4
+ASCII characters per token, one token per CJK character) that is close
+enough for budgeting. There is no global memo (it would pin every
+measured string); callers that re-read a count keep it themselves, as
+HistoryManager does per message.
+"""
+
+from typing import Any, Optional
+
+from .config import MODEL_NAME
+
+try:
+    import tiktoken  # type: ignore
+except ImportError:
+    tiktoken = None  # type: ignore
+
+_encoding: Optional[Any] = None
+
+
+def _get_encoding() -> Any:
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(MODEL_NAME)
+        except KeyError:
+            _encoding = tiktoken.get_encoding("o200k_base")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of prompt tokens in `text` for MODEL_NAME (approximate without tiktoken)."""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_get_encoding().encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
@@ -0,0 +1,206 @@
+"""Stage-level timing spans.
+
+    with tracing.span("search", query=req.query_text) as s:
+        items = await client.search(req)
+        s.set(items=len(items))
+
+Finished spans (name, duration, attributes, parent span name) go to every
+registered sink: LogSink prints one line per span, HistogramSink keeps
+per-stage latency histograms in memory, and OTelSink exports to
+OpenTelemetry when it is installed. With no sinks registered (the
+default), span() returns a shared no-op object, so instrumented code only
+pays for one function call and an empty-list check.
+
+Sinks can also be enabled with MERCARI_TRACE, a comma-separated list of
+"log", "histogram" and "otel" (see TRACE_SINKS).
+"""
+
+import bisect
+import contextvars
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import TRACE_SINKS
+
+try:
+    from opentelemetry import trace as otel_trace  # type: ignore
+except ImportError:
+    otel_trace = None  # type: ignore
+
+# Prometheus client default buckets (seconds).
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "mercari_agent_span", default=None
+)
+_sinks: List[Any] = []
+
+
+class Span:
+    """A timed stage. Use via span(); attributes can be added while it runs."""
+
+    __slots__ = ("name", "attrs", "parent", "start_s", "duration_s", "_token")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.parent: Optional[str] = None
+        self.start_s = 0.0
+        self.duration_s = 0.0
+        self._token: Optional[contextvars.Token] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        self.parent = parent.name if parent is not None else None
+        self._token = _current.set(self)
+        self.start_s = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.duration_s = time.perf_counter() - self.start_s
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited from another context, e.g. an abandoned async generator
+            # being closed by the event loop.
+            pass
+        for sink in _sinks:
+            sink.record(self)
+
+
+class _NoopSpan:
+    """Stand-in returned by span() while no sinks are registered."""
+
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """Context manager timing one stage; a no-op unless a sink is registered."""
+    if not _sinks:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def add_sink(sink: Any) -> Any:
+    """Register a sink (any object with record(span)) and return it."""
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Any) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def sinks() -> List[Any]:
+    return list(_sinks)
+
+
+class LogSink:
+    """Prints one line per finished span."""
+
+    def record(self, span: Span) -> None:
+        attrs = " ".join(f"{k}={v}" for k, v in span.attrs.items())
+        parent = f" parent={span.parent}" if span.parent else ""
+        print(f"[trace] {span.name} {span.duration_s * 1000:.1f}ms{parent} {attrs}".rstrip())
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.counts = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class HistogramSink:
+    """Per-stage latency histograms kept in memory (Prometheus-style buckets)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def record(self, span: Span) -> None:
+        hist = self._histograms.get(span.name)
+        if hist is None:
+            hist = self._histograms[span.name] = _Histogram(len(self.buckets))
+        hist.counts[bisect.bisect_left(self.buckets, span.duration_s)] += 1
+        hist.sum += span.duration_s
+        hist.count += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Stage -> {"buckets": [(le, cumulative count), ...], "sum", "count"}."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, hist in list(self._histograms.items()):
+            cumulative = 0
+            buckets: List[Tuple[float, int]] = []
+            for le, n in zip((*self.buckets, float("inf")), hist.counts):
+                cumulative += n
+                buckets.append((le, cumulative))
+            out[name] = {"buckets": buckets, "sum": hist.sum, "count": hist.count}
+        return out
+
+    def reset(self) -> None:
+        self._histograms.clear()
+
+
+class OTelSink:
+    """Exports finished spans through the OpenTelemetry API (requires opentelemetry-api).
+
+    Spans are created after the fact with their measured start/end times;
+    the enclosing stage is recorded as the "parent" attribute.
+    """
+
+    def __init__(self, tracer_name: str = "mercari_agent") -> None:
+        if otel_trace is None:
+            raise RuntimeError("opentelemetry is not installed")
+        self._tracer = otel_trace.get_tracer(tracer_name)
+        # perf_counter -> wall clock (ns) offset, fixed once.
+        self._offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def record(self, span: Span) -> None:
+        start_ns = int(span.start_s * 1e9) + self._offset_ns
+        attributes = {
+            k: v if isinstance(v, (bool, int, float, str)) else str(v)
+            for k, v in span.attrs.items()
+        }
+        if span.parent:
+            attributes["parent"] = span.parent
+        otel_span = self._tracer.start_span(span.name, start_time=start_ns, attributes=attributes)
+        otel_span.end(end_time=start_ns + int(span.duration_s * 1e9))
+
+
+_SINK_TYPES = {"log": LogSink, "histogram": HistogramSink, "otel": OTelSink}
+
+
+def configure(spec: str) -> None:
+    """Register sinks from a comma-separated spec such as "log,histogram"."""
+    for name in filter(None, (part.strip() for part in spec.split(","))):
+        if name not in _SINK_TYPES:
+            raise ValueError(f"Unknown trace sink: {name!r}")
+        add_sink(_SINK_TYPES[name]())
+
+
+configure(TRACE_SINKS)
@@ -1,35 +1,77 @@
 """"Utility functions for Mercari Agent."""
-import re
-from dataclasses import asdict
-from typing import Any, Dict, List
+import dataclasses
+import json
+from typing import Any, Dict, List, Optional, Tuple
 
-from .models import ProductFull
+from .models import ProductFull, ProductShallow, SearchRequest
+from .tokenizer import tokenize as _tokenize
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+# Field names per product class, in declaration order (what asdict would emit).
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
 
 
 def tokenize(text: str) -> List[str]:
-    """Simple tokenizer for EN/JA text used for relevance scoring."""
-    tokens = re.findall(r"[A-Za-z0-9ぁ-んァ-ン一-龥ー]+", text.lower())
-    seen = set()
-    uniq: List[str] = []
-    for t in tokens:
-        if t not in seen:
-            seen.add(t)
-            uniq.append(t)
-    return uniq
+    """Simple tokenizer for EN/JA text used for relevance scoring (see tokenizer.tokenize)."""
+    return list(_tokenize(text))
+
+
+def search_request_key(
+    request: SearchRequest, limit: int
+) -> Tuple[str, Optional[str], Optional[int], Optional[int], Optional[str], int]:
+    """Normalized, hashable key for a search; requests that hit Mercari identically share it."""
+    query = " ".join(request.query_text.lower().split())
+    location = " ".join(request.location.lower().split()) if request.location else None
+    # Anything other than seller/buyer pays maps to "no shipping filter" in MercapiClient.
+    shipping = request.shipping_preference
+    if shipping not in ("seller_pays", "buyer_pays"):
+        shipping = None
+    # mercapi sends 0 for an unset price bound, so 0 and None are the same search.
+    return (query, location or None, request.min_price or None, request.max_price or None, shipping, limit)
+
+
+def product_url(p: ProductShallow) -> Optional[str]:
+    """Public Mercari URL for a product, built from its ID when not set."""
+    if not p.url and p.id and p.item_type == "ITEM_TYPE_MERCARI":
+        return f"https://jp.mercari.com/item/{p.id}"
+    return p.url
 
 
-def serialize_product(p: ProductFull) -> Dict[str, Any]:
-    """Convert ProductFull (including all ProductShallow fields) to JSON-serializable dict."""
-    data = asdict(p)
+def serialize_product(p: ProductShallow) -> Dict[str, Any]:
+    """Convert ProductFull (including all ProductShallow fields) to JSON-serializable dict.
+
+    Reads the fields directly instead of via dataclasses.asdict, which
+    deep-copies every value; `attributes` is shared with the product.
+    """
+    names = _FIELD_NAMES.get(type(p))
+    if names is None:
+        names = _FIELD_NAMES[type(p)] = tuple(f.name for f in dataclasses.fields(p))
+    data = {name: getattr(p, name) for name in names}
 
     # Ensure we always have a usable Mercari URL when possible.
-    url = data.get("url")
-    if not url and data.get("id") and data.get("item_type") == "ITEM_TYPE_MERCARI":
-        data["url"] = f"https://jp.mercari.com/item/{data['id']}"
+    data["url"] = product_url(p)
 
     return data
 
 
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON (non-ASCII unescaped), via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps_str(data: Any) -> str:
+    """dumps() as a str, e.g. for message content."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
 def message_to_dict(msg: Any) -> Dict[str, Any]:
     """Convert OpenAI chat message to a plain dict we can keep in history."""
     payload: Dict[str, Any] = {"role": msg.role, "content": msg.content}
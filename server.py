@@ -1,11 +1,34 @@
 
 import asyncio
-from fastapi import FastAPI, HTTPException
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from mercari_agent import MercariChatAgent
+from mercari_agent import SessionManager, metrics
+from mercari_agent.sessions import is_valid_session_id
+from mercari_agent.utils import dumps
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+SESSION_HEADER = "X-Session-Id"
+SESSION_COOKIE = "session_id"
+
+# One agent per session; all sessions share the Mercari client, caches and HTTP pools.
+sessions = SessionManager()
+# Per-stage latency histograms for /metrics.
+metrics.enable_stage_histograms()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Persist live sessions' history on shutdown (no-op unless MERCARI_SESSION_DIR is set).
+    await sessions.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for local development
 app.add_middleware(
@@ -14,23 +37,63 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[SESSION_HEADER],
 )
 
 class ChatRequest(BaseModel):
     message: str
 
-# Shared agent instance
-# Note: In a real multi-user env, we'd need session management.
-# For this portfolio demo, a shared single-session agent is acceptable/expected.
-agent = MercariChatAgent()
+
+def resolve_session_id(request: Request) -> str:
+    """Session ID from the header, then the cookie; a new one if neither is valid."""
+    session_id: Optional[str] = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+    if is_valid_session_id(session_id):
+        return session_id
+    return uuid.uuid4().hex
+
 
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request):
+    session_id = resolve_session_id(http_request)
     try:
-        reply = await agent.chat(request.message)
-        return {"reply": reply}
+        # Turns within one session run one at a time; other sessions are not blocked.
+        async with sessions.turn(session_id) as session:
+            reply = await session.agent.chat(request.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Pre-encoded JSON skips FastAPI's jsonable_encoder + json.dumps pass.
+    response = Response(dumps({"reply": reply, "session_id": session_id}), media_type="application/json")
+    response.headers[SESSION_HEADER] = session_id
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+    return response
+
+def format_sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event (JSON data never contains raw newlines)."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    """Stream one turn as SSE: start, searching, ranked, token..., done."""
+    session_id = resolve_session_id(http_request)
+
+    async def events():
+        # Flush something immediately so clients see the first byte before any LLM work.
+        yield format_sse("start", {"session_id": session_id})
+        try:
+            async with sessions.turn(session_id) as session:
+                async for event, data in session.agent.chat_stream(request.message):
+                    yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+
+    response = StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", SESSION_HEADER: session_id},
+    )
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+    return response
 
 @app.get("/")
 async def root():
@@ -38,7 +101,12 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "sessions": len(sessions)}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape target; reads counters and live gauges without locking."""
+    return PlainTextResponse(metrics.render(sessions), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import unittest
+from typing import List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.bm25 import Bm25Query, IdfCache, IdfTable  # noqa: E402
+from mercari_agent.fake import FakeMercariClient  # noqa: E402
+from mercari_agent.models import SearchRequest  # noqa: E402
+from mercari_agent.recommender import RecommendationService  # noqa: E402
+
+_KEYWORDS = ["Sony TV", "ソニー テレビ", "スマートテレビ"]
+
+
+def _client() -> FakeMercariClient:
+    client = FakeMercariClient(catalog_size=3000, enrich_latency_s=0.001)
+    # Fake descriptions never mention the product; make a third of them do.
+    for i, item in enumerate(client.catalog):
+        if i % 3 == 0:
+            item.detail.description += "\n" + item.name
+    return client
+
+
+async def _recommend(
+    early_stop: bool = True,
+    scoring_engine: str = "python",
+    client: Optional[FakeMercariClient] = None,
+    idf_cache: Optional[IdfCache] = None,
+    keywords: List[str] = _KEYWORDS,
+) -> List[str]:
+    svc = RecommendationService(
+        client=client or _client(),
+        max_shallow=360,
+        max_candidates=120,
+        max_price_jpy=30000,
+        enrich_deadline_s=None,
+        early_stop=early_stop,
+        scoring_engine=scoring_engine,
+        relevance_mode="bm25",
+        idf_cache=idf_cache,
+    )
+    requests = [SearchRequest(query_text=k, max_price=30000) for k in keywords]
+    products = await svc.recommend(requests, "Sony TV 4K 美品")
+    assert any(svc._detail_relevance.values()), "descriptions should match the query"
+    return [p.id for p in products]
+
+
+class Bm25QueryTest(unittest.TestCase):
+    def test_score_is_independent_of_other_documents_and_bounded(self):
+        table = IdfTable()
+        table.add("a", ["ソニ", "テレ"])
+        query = Bm25Query("ソニー テレビ", table)
+        score = query.score("ソニー テレビ 美品")
+        self.assertGreater(score, 0.0)
+        self.assertLess(score, 1.0)
+        self.assertEqual(query.score("ソニー テレビ 美品"), score)
+        self.assertEqual(query.score("動作確認済みです。"), 0.0)
+
+
+class DetailRelevanceTest(unittest.TestCase):
+    def test_early_stop_does_not_change_rankings(self):
+        for engine in ("python", "numpy"):
+            with self.subTest(engine=engine):
+                stopped = asyncio.run(_recommend(True, engine))
+                full = asyncio.run(_recommend(False, engine))
+                self.assertTrue(stopped)
+                self.assertEqual(stopped, full)
+
+    def test_repeat_turns_with_a_shared_idf_cache_are_stable(self):
+        async def turns():
+            client, idf_cache = _client(), IdfCache()
+            first = await _recommend(client=client, idf_cache=idf_cache)
+            await _recommend(client=client, idf_cache=idf_cache, keywords=["Sony TV", "4K"])
+            again = await _recommend(client=client, idf_cache=idf_cache)
+            return first, again
+
+        first, again = asyncio.run(turns())
+        self.assertEqual(first, again)
+
+
+if __name__ == "__main__":
+    unittest.main()
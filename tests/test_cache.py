@@ -0,0 +1,56 @@
+import os
+import tempfile
+import threading
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.cache import ItemCache  # noqa: E402
+
+_FIELDS = {"seller_rating": 4.8, "description": "動作確認済みです。", "shipping_fee_included": True}
+
+
+class ItemCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._dir.name, "items.sqlite")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    async def test_restarted_cache_reads_sqlite_in_one_batch(self):
+        cache = ItemCache(db_path=self.db_path)
+        await cache.put_many({"m1": _FIELDS, "m2": dict(_FIELDS, seller_rating=3.5)})
+        cache.close()
+
+        restarted = ItemCache(db_path=self.db_path)
+        select = restarted._select
+        calls = []
+
+        def recording_select(item_ids):
+            calls.append((list(item_ids), threading.get_ident()))
+            return select(item_ids)
+
+        restarted._select = recording_select
+        found = await restarted.get_many(["m1", "m2", "m3"])
+        self.assertEqual(found, {"m1": _FIELDS, "m2": dict(_FIELDS, seller_rating=3.5)})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0], ["m1", "m2", "m3"])
+        self.assertNotEqual(calls[0][1], threading.get_ident())
+        self.assertEqual((restarted.hits, restarted.misses), (2, 1))
+
+        # Now in memory: no second SQLite query.
+        self.assertEqual(await restarted.get_many(["m1"]), {"m1": _FIELDS})
+        self.assertEqual(len(calls), 1)
+        restarted.close()
+
+    async def test_expired_entries_are_misses(self):
+        cache = ItemCache(ttl_s=-1.0, db_path=self.db_path)
+        await cache.put_many({"m1": _FIELDS})
+        self.assertEqual(await cache.get_many(["m1"]), {})
+        self.assertEqual(cache.misses, 1)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import time
+import unittest
+from typing import List, Optional, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.fake import FakeMercariClient  # noqa: E402
+from mercari_agent.models import SearchRequest  # noqa: E402
+from mercari_agent.recommender import RecommendationService  # noqa: E402
+
+_KEYWORDS = ["Sony TV", "ソニー テレビ", "スマートテレビ"]
+
+
+async def _recommend(
+    early_stop: bool = True,
+    scoring_engine: str = "python",
+    enrich_latency_s: float = 0.002,
+    enrich_deadline_s: Optional[float] = None,
+) -> Tuple[List[str], int, int]:
+    """Ranked IDs, items scored and completed enrichments for one recommend() call."""
+    client = FakeMercariClient(catalog_size=4000, enrich_latency_s=enrich_latency_s)
+    svc = RecommendationService(
+        client=client,
+        max_shallow=360,
+        max_candidates=360,
+        max_price_jpy=30000,
+        enrich_deadline_s=enrich_deadline_s,
+        early_stop=early_stop,
+        scoring_engine=scoring_engine,
+    )
+    requests = [SearchRequest(query_text=k, max_price=30000) for k in _KEYWORDS]
+    products = await svc.recommend(requests, "Sony TV 4K 美品")
+    return [p.id for p in products], len(svc._parts), client.enrichments
+
+
+class EarlyStopTest(unittest.TestCase):
+    def test_early_stop_matches_full_enrichment(self):
+        for engine in ("python", "numpy"):
+            with self.subTest(engine=engine):
+                stopped, _, stopped_fetches = asyncio.run(_recommend(True, engine))
+                full, _, full_fetches = asyncio.run(_recommend(False, engine))
+                self.assertTrue(stopped)
+                self.assertEqual(stopped, full)
+                self.assertLess(stopped_fetches, full_fetches)
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_deadline_returns_what_has_arrived(self):
+        start = time.perf_counter()
+        ranked, scored, fetches = asyncio.run(
+            _recommend(early_stop=False, enrich_latency_s=0.05, enrich_deadline_s=0.02)
+        )
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertLess(fetches, scored)
+        self.assertLessEqual(len(ranked), fetches)
+
+
+if __name__ == "__main__":
+    unittest.main()
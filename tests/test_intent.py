@@ -0,0 +1,45 @@
+import os
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.config import FAST_PATH_MIN_CONFIDENCE  # noqa: E402
+from mercari_agent.intent import parse_intent  # noqa: E402
+
+
+class ParseIntentTest(unittest.TestCase):
+    def assertIntent(self, text, keywords, min_price, max_price):
+        intent = parse_intent(text)
+        self.assertEqual(intent.keywords, keywords)
+        self.assertEqual(intent.min_price, min_price)
+        self.assertEqual(intent.max_price, max_price)
+        self.assertGreaterEqual(intent.confidence, FAST_PATH_MIN_CONFIDENCE)
+        return intent
+
+    def test_model_number_before_tilde_is_not_a_lower_bound(self):
+        intent = self.assertIntent("iPhone 15 ~3万円 送料込み", "iPhone 15", None, 30000)
+        self.assertEqual(intent.shipping_preference, "seller_pays")
+
+    def test_wave_dash_without_lower_number_means_up_to(self):
+        self.assertIntent("PS5 〜5万円", "PS5", None, 50000)
+
+    def test_dash_after_model_number_means_up_to(self):
+        self.assertIntent("Switch 2 - 30000円", "Switch 2", None, 30000)
+
+    def test_bare_k_amount_after_qualifier(self):
+        self.assertIntent("PS5 under 50k", "PS5", None, 50000)
+
+    def test_bare_k_without_qualifier_stays_a_keyword(self):
+        self.assertIntent("4K TV 3万円", "4K TV", None, 30000)
+
+    def test_ranges(self):
+        self.assertIntent("PS5 10000-20000円", "PS5", 10000, 20000)
+        self.assertIntent("ソニー テレビ 1-2万円", "ソニー テレビ", 10000, 20000)
+
+    def test_minimum_above_maximum_is_not_confident(self):
+        intent = parse_intent("ps5 5万円以上 1万円以下")
+        self.assertLess(intent.confidence, FAST_PATH_MIN_CONFIDENCE)
+
+
+if __name__ == "__main__":
+    unittest.main()
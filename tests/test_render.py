@@ -0,0 +1,42 @@
+import os
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.models import ProductFull  # noqa: E402
+from mercari_agent.render import render_recommendations  # noqa: E402
+
+
+def _product(i: int) -> ProductFull:
+    return ProductFull(id=f"m{i}", name=f"PS5 本体 {i}", price_jpy=40000, item_type="ITEM_TYPE_MERCARI")
+
+
+class FollowUpTest(unittest.TestCase):
+    def test_single_keyword_no_results_does_not_repeat_search(self):
+        reply = render_recommendations([], 1000, ["PS5"])
+        self.assertIn("couldn't find any matching items", reply)
+        self.assertNotIn('"PS5"', reply)
+        self.assertIn("1,500 JPY", reply)
+
+    def test_single_keyword_without_budget_falls_back_to_generic(self):
+        reply = render_recommendations([], None, ["PS5"])
+        self.assertNotIn('"PS5"', reply)
+        self.assertIn("different keywords or a higher budget", reply)
+
+    def test_broader_keyword_is_suggested(self):
+        reply = render_recommendations([_product(1)], 50000, ["PS5 本体 新品", "PS5 console"])
+        self.assertIn('"PS5"', reply)
+        self.assertNotIn('"PS5 console"', reply)
+
+    def test_broader_keyword_skips_searched_ones(self):
+        reply = render_recommendations([], None, ["PS5 console", "PS5"])
+        self.assertNotIn('"PS5', reply)
+        self.assertIn("different keywords", reply)
+
+    def test_no_follow_up_with_enough_results(self):
+        reply = render_recommendations([_product(i) for i in range(3)], 50000, ["PS5"])
+        self.assertNotIn("Would you like", reply)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.cache import CachedMercariClient  # noqa: E402
+from mercari_agent.fake import FakeMercariClient  # noqa: E402
+from mercari_agent.models import SearchRequest  # noqa: E402
+from mercari_agent.recommender import KeyedInclude, RecommendationService, shared_search_key  # noqa: E402
+
+
+class SearchKeyTest(unittest.TestCase):
+    def test_include_settings_are_part_of_the_key(self):
+        request = SearchRequest(query_text="PS5")
+        cheap = KeyedInclude(lambda item: True, (30000, 4.0))
+        dear = KeyedInclude(lambda item: True, (60000, 4.0))
+        same = KeyedInclude(lambda item: False, (30000, 4.0))
+        self.assertNotEqual(shared_search_key(request, 120, cheap), shared_search_key(request, 120, dear))
+        self.assertEqual(shared_search_key(request, 120, cheap), shared_search_key(request, 120, same))
+        self.assertIsNone(shared_search_key(request, 120, lambda item: True))
+
+
+class CachedSearchTest(unittest.TestCase):
+    def test_services_with_different_budgets_do_not_share_pools(self):
+        fake = FakeMercariClient(catalog_size=2000)
+        client = CachedMercariClient(fake)
+        request = SearchRequest(query_text="PS5")
+
+        async def search(max_price_jpy):
+            svc = RecommendationService(client=client, max_shallow=60, max_price_jpy=max_price_jpy)
+            return await svc._search(request)
+
+        async def run():
+            return [await search(price) for price in (30000, 80000, 30000)]
+
+        cheap, dear, cheap_again = asyncio.run(run())
+        self.assertEqual(fake.searches, 2)
+        self.assertIs(cheap_again, cheap)
+        self.assertNotEqual([item.id_ for item in cheap], [item.id_ for item in dear])
+
+    def test_plain_include_is_not_cached(self):
+        fake = FakeMercariClient(catalog_size=200)
+        client = CachedMercariClient(fake)
+        request = SearchRequest(query_text="PS5")
+
+        async def run():
+            for _ in range(2):
+                await client.search(request, limit=10, include=lambda item: item.price < 30000)
+
+        asyncio.run(run())
+        self.assertEqual(fake.searches, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.fake import FakeMercariClient  # noqa: E402
+from mercari_agent.sessions import SessionManager  # noqa: E402
+
+
+def _manager(**kwargs) -> SessionManager:
+    return SessionManager(mercari_client=FakeMercariClient(catalog_size=10), **kwargs)
+
+
+class SessionManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_referenced_session_is_not_evicted(self):
+        sessions = _manager(max_sessions=1, spill_dir=None)
+        # A turn that has the session but hasn't taken its lock yet (e.g. queued behind another).
+        session = await sessions.get("a")
+        self.assertFalse(session.lock.locked())
+        async with sessions.turn("b"):
+            pass
+        sessions.release(session)
+        async with sessions.turn("a") as again:
+            self.assertIs(again, session)
+
+    async def test_queued_turns_run_one_at_a_time_on_the_same_session(self):
+        sessions = _manager(max_sessions=1, spill_dir=None)
+        first_turn_running = asyncio.Event()
+        finish_first_turn = asyncio.Event()
+
+        async def first_turn():
+            async with sessions.turn("a") as session:
+                first_turn_running.set()
+                await finish_first_turn.wait()
+                return session
+
+        async def second_turn():
+            async with sessions.turn("a") as session:
+                return session
+
+        first = asyncio.create_task(first_turn())
+        await first_turn_running.wait()
+        second = asyncio.create_task(second_turn())
+        await asyncio.sleep(0)
+        self.assertFalse(second.done())
+        finish_first_turn.set()
+        # The queued turn keeps "a" alive while "b" pushes it over capacity.
+        async with sessions.turn("b"):
+            pass
+        self.assertIs(await second, await first)
+        self.assertEqual((await first).refs, 0)
+
+    async def test_idle_session_is_evicted_over_capacity(self):
+        sessions = _manager(max_sessions=1, spill_dir=None)
+        async with sessions.turn("a") as first:
+            pass
+        async with sessions.turn("b"):
+            pass
+        async with sessions.turn("a") as again:
+            self.assertIsNot(again, first)
+
+    async def test_spilled_history_is_restored(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            sessions = _manager(max_sessions=1, spill_dir=spill_dir)
+            async with sessions.turn("a") as session:
+                session.agent.history.append_turn(
+                    {"role": "user", "content": "PS5 under 50000 yen"},
+                    {"role": "assistant", "content": "Here are some PS5 listings."},
+                )
+                saved = session.agent.history.to_dict()
+            async with sessions.turn("b"):
+                pass
+            async with sessions.turn("a") as restored:
+                self.assertIsNot(restored, session)
+                self.assertEqual(restored.agent.history.to_dict(), saved)
+            await sessions.close()
+            self.assertEqual(len(sessions), 0)
+            self.assertEqual(sorted(os.listdir(spill_dir)), ["a.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
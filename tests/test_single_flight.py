@@ -0,0 +1,102 @@
+import asyncio
+import os
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.recommender import SingleFlight  # noqa: E402
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_call(self):
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "items"
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await asyncio.gather(*waiters), ["items"] * 3)
+        self.assertEqual(calls, 1)
+        self.assertEqual(flight.coalesced, 2)
+
+    async def test_cancelling_one_waiter_keeps_the_shared_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await release.wait()
+            return "items"
+
+        first = asyncio.create_task(flight.do("key", fetch))
+        second = asyncio.create_task(flight.do("key", fetch))
+        await started.wait()
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        release.set()
+        self.assertEqual(await second, "items")
+
+    async def test_cancelling_every_waiter_cancels_the_call(self):
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        self.assertEqual(flight.in_flight(), 0)
+
+    async def test_exception_reaches_every_waiter(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise RuntimeError("upstream failed")
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+
+    async def test_flight_is_removed_after_success_and_failure(self):
+        flight = SingleFlight()
+
+        async def ok():
+            return 1
+
+        async def fail():
+            raise RuntimeError("upstream failed")
+
+        self.assertEqual(await flight.do("ok", ok), 1)
+        with self.assertRaises(RuntimeError):
+            await flight.do("fail", fail)
+        await asyncio.sleep(0)
+        self.assertEqual(flight.in_flight(), 0)
+        # A later call starts a new flight rather than reusing the finished one.
+        self.assertEqual(await flight.do("ok", ok), 1)
+        self.assertEqual(flight.coalesced, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
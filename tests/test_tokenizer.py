@@ -0,0 +1,24 @@
+import os
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from mercari_agent.tokenizer import normalize, tokenize, tokenize_many  # noqa: E402
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_full_width_ascii_folds_to_lowercase_ascii(self):
+        self.assertEqual(normalize("ＰＳ５"), "ps5")
+        self.assertEqual(tokenize("ＰＳ５ 本体"), tokenize("ps5 本体"))
+
+    def test_katakana_spellings_fold_together(self):
+        self.assertEqual(normalize("ｿﾆｰ"), normalize("ソニー"))
+        self.assertEqual(normalize("ソニー"), normalize("そにー"))
+
+    def test_tokenize_many_matches_tokenize(self):
+        names = ["ｿﾆｰ テレビ", "ＰＳ５ 本体", "ソニー テレビ"]
+        self.assertEqual(tokenize_many(names), [tokenize(name) for name in names])
+
+
+if __name__ == "__main__":
+    unittest.main()